@@ -1,31 +1,35 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback_context
+from dash import dcc, html, Input, Output, State, Patch, callback_context, no_update
+from flask import session
 import dash_bootstrap_components as dbc
 import pandas as pd
-import base64
+import plotly.graph_objects as go
+import functools
 import io
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
+import os
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
+from pathlib import Path
 import pandas as pd
 import numpy as np
-from basic_ollama_agent import OllamaAgent
+from basic_ollama_agent_with_post import OllamaAgent
 import ollama
 import json
 import inspect
-from typing import List, Callable, Optional, Any, Dict
+from typing import List, Callable, Optional, Any, Dict, NamedTuple, Tuple
 from pydantic import BaseModel
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 
 ####### Read Data and set things up ########
-df = pd.read_excel("bank_earnings_data_2019-01-01_2025-12-31.xlsx", sheet_name="Bank_Earnings_Data")
+EXCEL_PATH = "bank_earnings_data_2019-01-01_2025-12-31.xlsx"
+# Columnar copy of the Excel sheet with display names already applied; rebuilt when the xlsx changes
+PARQUET_PATH = "bank_earnings_data.parquet"
 
 bank_name_mapping = {'AMERICAN EXPRESS COMPANY': 'American Express',
     'Bank of America Corporation': 'Bank of America',
@@ -49,16 +53,188 @@ bank_name_mapping = {'AMERICAN EXPRESS COMPANY': 'American Express',
 
 }
 
-df['CompanyName'] = df['CompanyName'].replace(bank_name_mapping)
+
+def _compact_dtypes(data: pd.DataFrame) -> pd.DataFrame:
+    """Store company names as a categorical and a metric as float32 only when every value round-trips exactly"""
+    data['CompanyName'] = data['CompanyName'].astype('category')
+    for col in data.select_dtypes(include='number').columns:
+        as_float32 = data[col].astype('float32')
+        # to_numeric(downcast='float') tolerates rounding (3.57 -> 3.5699999); only exact columns shrink
+        if np.array_equal(as_float32.to_numpy(dtype='float64'), data[col].to_numpy(dtype='float64'), equal_nan=True):
+            data[col] = as_float32
+    return data
+
+
+def load_earnings_data() -> pd.DataFrame:
+    """Read the earnings sheet from the Parquet cache, converting the Excel file on first run"""
+    cache_is_fresh = os.path.exists(PARQUET_PATH) and (
+        not os.path.exists(EXCEL_PATH) or os.path.getmtime(PARQUET_PATH) >= os.path.getmtime(EXCEL_PATH)
+    )
+    if not cache_is_fresh:
+        data = pd.read_excel(EXCEL_PATH, sheet_name="Bank_Earnings_Data")
+        data['CompanyName'] = data['CompanyName'].replace(bank_name_mapping)
+        _compact_dtypes(data).to_parquet(PARQUET_PATH, engine="pyarrow", compression="snappy", index=False)
+    
+    # Always read back through Parquet so the metric columns are Arrow-backed (float[pyarrow])
+    # and filters run on Arrow compute kernels
+    data = pd.read_parquet(PARQUET_PATH, engine="pyarrow", dtype_backend="pyarrow")
+    # CompanyName would arrive as an Arrow dictionary column, which plotly's color grouping
+    # cannot look labels up in; keep it a pandas categorical instead
+    data['CompanyName'] = pd.Categorical(data['CompanyName'].to_numpy(dtype=object))
+    return data
+
+
+df = load_earnings_data()
+
+# The data never changes while the app runs, so the per-call filters are done once here
+LATEST_DATE = df['Datetime'].max()
+LATEST_SLICE = df.loc[df['Datetime'] == LATEST_DATE].set_index('CompanyName')
+HIST_BY_COMPANY = {name: sub for name, sub in df.groupby('CompanyName', sort=False, observed=True)}
+ALLOWED_COMPANIES = tuple(sorted(df['CompanyName'].unique()))
+METRIC_COLUMNS = tuple(df.columns[2:])
+_METRIC_SET = frozenset(METRIC_COLUMNS)
+_COMPANY_SET = frozenset(ALLOWED_COMPANIES)
+
+
+def _check_company_names(company_names: List[str]) -> None:
+    """Fail fast on names the LLM did not map to a known company, instead of returning empty data"""
+    unknown = [name for name in company_names if name not in _COMPANY_SET]
+    if unknown:
+        raise ValueError(f"Unknown company name(s): {', '.join(unknown)}. Allowed names are: {', '.join(ALLOWED_COMPANIES)}")
+
+# Raw NumPy views for the JIT-compiled latest-value gather used by compare_metrics_latest
+_COMPANY_CODES, _COMPANY_LABELS = pd.factorize(df['CompanyName'])
+_COMPANY_CODE_BY_NAME = {name: code for code, name in enumerate(_COMPANY_LABELS)}
+_DATES_I8 = df['Datetime'].to_numpy(dtype='datetime64[ns]').view('i8')
+_LATEST_I8 = _DATES_I8.max()
+_LATEST_ROW_COUNT = int((_DATES_I8 == _LATEST_I8).sum())
+_metric_arrays: Dict[str, np.ndarray] = {}
+
+
+def _metric_array(metric: str) -> np.ndarray:
+    values = _metric_arrays.get(metric)
+    if values is None:
+        values = df[metric].to_numpy(dtype=np.float64, na_value=np.nan)
+        _metric_arrays[metric] = values
+    return values
+
+
+def _gather_latest_py(codes, dates, latest, values, wanted, out_codes, out_values):
+    """Copy (company code, value) for every latest-date row of a wanted company; returns the row count"""
+    k = 0
+    for i in range(codes.size):
+        if dates[i] == latest and wanted[codes[i]]:
+            out_codes[k] = codes[i]
+            out_values[k] = values[i]
+            k += 1
+    return k
+
+
+@functools.lru_cache(maxsize=1)
+def _gather_latest_kernel():
+    """JIT-compile the gather on first use, so app start-up does not pay for importing numba"""
+    from numba import njit
+    return njit(cache=True)(_gather_latest_py)
 ### Generate prompt without xml tags for the agent
 role = "You are an expert Earnings Data Extractor and Analyzer. " 
 task = "Call the appropriate functions to extract the earnings data from the DataFrame and analyze it for the companies mentioned.\n"
 
-context_company_names = "\nWhen the user asks to search for a company, try to map their mentioned name to a list of pre-defined companies. The allowed company names are as follows :" + f"{', '.join(df['CompanyName'].unique().tolist())}" + "\n"
+context_company_names = "\nWhen the user asks to search for a company, try to map their mentioned name to a list of pre-defined companies. The allowed company names are as follows :" + f"{', '.join(ALLOWED_COMPANIES)}" + "\n"
 
-Context = "\nHere are the metrics present in the data:" + f"{', '.join(df.columns.tolist()[2:])}" + ""
+Context = "\nHere are the metrics present in the data:" + f"{', '.join(METRIC_COLUMNS)}" + ""
 prompt = role + task + context_company_names + Context
 
+
+class Chart(NamedTuple):
+    """Plot spec returned by the plotting tools; drawn with Plotly in the chat and matplotlib in the PDF"""
+    kind: str
+    metric: str
+    data: pd.DataFrame
+
+
+PDF_DPI = 150
+
+
+def plotly_bar(metric_data: pd.DataFrame, metric: str) -> go.Figure:
+    """Bar chart of one metric per company, drawn client-side by dcc.Graph"""
+    import plotly.express as px
+    
+    fig = px.bar(
+        metric_data.reset_index(),
+        x='CompanyName',
+        y=metric,
+        color=metric,
+        color_continuous_scale='Viridis',
+        title=f'Latest {metric} Comparison for Companies'
+    )
+    fig.update_layout(xaxis_title='Company Name', yaxis_title=metric, xaxis_tickangle=-45)
+    return fig
+
+
+def plotly_line(filtered_df: pd.DataFrame, metric: str) -> go.Figure:
+    """Line chart of one metric over time, one trace per company"""
+    import plotly.express as px
+    
+    fig = px.line(
+        filtered_df,
+        x='Datetime',
+        y=metric,
+        color='CompanyName',
+        markers=True,
+        title=f'{metric} Over Time for Companies'
+    )
+    fig.update_layout(xaxis_title='Date', yaxis_title=metric, legend_title_text='Company Name')
+    return fig
+
+
+def _chart_figure(chart: Chart) -> go.Figure:
+    if chart.kind == 'bar':
+        return plotly_bar(chart.data, chart.metric)
+    return plotly_line(chart.data, chart.metric)
+
+
+def _render_chart_png(chart: Chart, dpi: int = PDF_DPI) -> bytes:
+    """Draw a Chart with matplotlib and return the PNG bytes, so no Figure crosses a process boundary"""
+    # Imported here so only the PDF export pays for matplotlib; a bare Figure avoids pyplot's global state
+    from matplotlib import cm
+    from matplotlib.figure import Figure
+    
+    metric = chart.metric
+    if chart.kind == 'bar':
+        metric_data = chart.data
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        bar_colors = cm.viridis(np.linspace(0, 1, len(metric_data)))
+        ax.bar(metric_data.index.astype(str), metric_data[metric].to_numpy(dtype='float64', na_value=np.nan), color=bar_colors)
+        ax.set_title(f'Latest {metric} Comparison for Companies')
+        ax.set_xlabel('Company Name')
+    else:
+        filtered_df = chart.data
+        fig = Figure(figsize=(12, 8))
+        ax = fig.subplots()
+        for name, sub in filtered_df.groupby('CompanyName', sort=False, observed=True):
+            # matplotlib wants NumPy arrays, not Arrow-backed columns
+            ax.plot(
+                sub['Datetime'].to_numpy(dtype='datetime64[ns]'),
+                sub[metric].to_numpy(dtype='float64', na_value=np.nan),
+                marker='o',
+                label=name
+            )
+        ax.set_title(f'{metric} Over Time for Companies')
+        ax.set_xlabel('Date')
+        ax.legend(title='Company Name')
+    ax.set_ylabel(metric)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    img_buffer = io.BytesIO()
+    fig.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return img_buffer.getvalue()
+
+
+# PDF chart rasterization is CPU-bound; keep it off the Dash callback threads
+_PLOT_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
 def compare_metrics_latest(company_names: str, metric: str):
     """
     This function compares the latest values of a specified metric for a list of companies.
@@ -71,25 +247,30 @@ def compare_metrics_latest(company_names: str, metric: str):
         pd.DataFrame: A DataFrame containing the latest values of the specified metric for the given companies.
     
     Raises:
-        ValueError: If the metric is not found in the DataFrame.
+        ValueError: If the metric or a company is not found in the DataFrame.
     """
     if type(company_names) is  str:
         company_names = [name.strip() for name in company_names.split(',')]
+    _check_company_names(company_names)
     
-    latest_date = df['Datetime'].max()
-    
-    # Filter df
-    latest_data = df[df['Datetime'] == latest_date]
-
-    # Select relevant companies
-    latest_data = latest_data[latest_data['CompanyName'].isin(company_names)]
-
     # Check if metric exists
-    if metric not in latest_data.columns:
+    if metric not in _METRIC_SET:
         raise ValueError(f"Metric '{metric}' not found in the data.")
     
-    # Extract the relevant data
-    metric_data = latest_data[['CompanyName', metric]].set_index('CompanyName')
+    # Extract the relevant data for the companies present at the latest date
+    wanted = np.zeros(len(_COMPANY_LABELS), dtype=np.bool_)
+    for name in company_names:
+        code = _COMPANY_CODE_BY_NAME.get(name)
+        if code is not None:
+            wanted[code] = True
+    
+    out_codes = np.empty(_LATEST_ROW_COUNT, dtype=_COMPANY_CODES.dtype)
+    out_values = np.empty(_LATEST_ROW_COUNT, dtype=np.float64)
+    n = _gather_latest_kernel()(_COMPANY_CODES, _DATES_I8, _LATEST_I8, _metric_array(metric), wanted, out_codes, out_values)
+    metric_data = pd.DataFrame(
+        {metric: out_values[:n]},
+        index=pd.Index(np.asarray(_COMPANY_LABELS)[out_codes[:n]], name='CompanyName')
+    )
 
     return metric_data
 
@@ -104,40 +285,25 @@ def plot_metrics_comparison_latest(company_names: str, metric: str):
         metric (str): The metric to compare, e.g., 'EPS', 'Revenue', etc.
 
     Returns:
-        Matplotlib plot: A plot containing the latest values of the specified metric for the given companies.
+        Chart: A bar chart of the latest values of the specified metric for the given companies.
 
     Raises:
-        ValueError: If the metric is not found in the DataFrame.
+        ValueError: If the metric or a company is not found in the DataFrame.
     """
     if type(company_names) is  str:
         company_names = [name.strip() for name in company_names.split(',')]
+    _check_company_names(company_names)
     print(company_names)
-    latest_date = df['Datetime'].max()
-    
-    # Filter df
-    latest_data = df[df['Datetime'] == latest_date]
-
-    # Select relevant companies
-    latest_data = latest_data[latest_data['CompanyName'].isin(company_names)]
-
     # Check if metric exists
-    if metric not in latest_data.columns:
+    if metric not in _METRIC_SET:
         raise ValueError(f"Metric '{metric}' not found in the data.")
     
-    # Extract the relevant data
-    metric_data = latest_data[['CompanyName', metric]].set_index('CompanyName')
+    # Extract the relevant data for the companies present at the latest date
+    company_names = [name for name in company_names if name in LATEST_SLICE.index]
+    metric_data = LATEST_SLICE.loc[company_names, [metric]]
     metric_data = metric_data.sort_values(by=metric, ascending=False)
     
-    # Plotting  
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x=metric_data.index, y=metric_data[metric], palette='viridis')
-    plt.title(f'Latest {metric} Comparison for Companies')
-    plt.xlabel('Company Name')
-    plt.ylabel(metric)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
-    return plt.gcf()
+    return Chart(kind='bar', metric=metric, data=metric_data)
 
 
 def plot_and_compare_metrics_over_history(company_names: str, metric: str):
@@ -147,45 +313,38 @@ def plot_and_compare_metrics_over_history(company_names: str, metric: str):
         company_names (str): Comma-separated string of company names to compare.
         metric (str): The metric to compare, e.g., 'EPS', 'Revenue', etc.
     Returns:
-        Matplotlib plot: A plot containing the historical values of the specified metric for the given companies.
+        Chart: A line chart of the historical values of the specified metric for the given companies.
             
     Raises:
-        ValueError: If the metric is not found in the DataFrame.
+        ValueError: If the metric or a company is not found in the DataFrame.
     """
     # Filter for company
     if type(company_names) is  str:
         company_names = [name.strip() for name in company_names.split(',')]
+    _check_company_names(company_names)
     
-    # Filter df
-    filtered_df = df[df['CompanyName'].isin(company_names)]
-
     # Check if metric exists
-    if metric not in filtered_df.columns:
+    if metric not in _METRIC_SET:
         raise ValueError(f"Metric '{metric}' not found in the data.")
     
-    # Plotting
-    plt.figure(figsize=(12, 8))
-    sns.lineplot(data=filtered_df, x='Datetime', y=metric, hue='CompanyName', marker='o')
-    plt.title(f'{metric} Over Time for Companies')
-    plt.xlabel('Date')
-    plt.ylabel(metric)
-    plt.xticks(rotation=45)
-    plt.legend(title='Company Name')
-    plt.tight_layout()
-    plt.show()
-    return plt.gcf()
+    # Stitch together the pre-split per-company histories
+    histories = [HIST_BY_COMPANY[name] for name in company_names]
+    filtered_df = pd.concat(histories) if histories else df.iloc[0:0]
+    
+    return Chart(kind='line', metric=metric, data=filtered_df[['Datetime', 'CompanyName', metric]])
 
 # Create agent
 model = "qwen2.5:7b"
 agent = OllamaAgent(
     model_name=model,
     tools=[compare_metrics_latest, plot_metrics_comparison_latest, plot_and_compare_metrics_over_history],
-    output_schema=None
+    output_schema=None,
+    system=prompt
 )
 
 # Use agent
-#result = agent.invoke(prompt + "Plot the interest income of wells fargo, JP morgan, citi, american express and bank of america for the latest date.")
-#result = agent.invoke(prompt + "Plot the interest income of wells fargo, JP morgan, citi, american express and bank of america for history")
+#result = agent.invoke("Plot the interest income of wells fargo, JP morgan, citi, american express and bank of america for the latest date.")
+#result = agent.invoke("Plot the interest income of wells fargo, JP morgan, citi, american express and bank of america for history")
 
 
 
@@ -207,6 +366,44 @@ agent = OllamaAgent(
 
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+_secret_key = os.environ.get("DASH_SECRET_KEY")
+if not _secret_key:
+    warnings.warn(
+        "DASH_SECRET_KEY is not set; using a random per-process key. Session cookies will not be "
+        "shared between workers and every restart drops all chat sessions. Set DASH_SECRET_KEY "
+        "for any multi-worker or long-running deployment.",
+        RuntimeWarning
+    )
+    _secret_key = os.urandom(24)
+app.server.secret_key = _secret_key
+
+# Chat history lives server-side per browser session, so callbacks only ship the new messages.
+# Least recently used sessions are evicted beyond MAX_SESSIONS, and idle ones after SESSION_TTL seconds
+MAX_SESSIONS = 500
+SESSION_TTL = 4 * 60 * 60
+SESSIONS: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _session_id() -> str:
+    if 'sid' not in session:
+        session['sid'] = str(uuid.uuid4())
+    return session['sid']
+
+
+def _session_history() -> List[dict]:
+    sid, now = _session_id(), time.monotonic()
+    with _SESSIONS_LOCK:
+        entry = SESSIONS.pop(sid, None)
+        history = entry[1] if entry is not None and now - entry[0] < SESSION_TTL else []
+        SESSIONS[sid] = (now, history)
+        # Oldest entries sit at the front; drop expired ones and anything over the cap
+        while SESSIONS:
+            oldest_sid, (last_seen, _) = next(iter(SESSIONS.items()))
+            if len(SESSIONS) <= MAX_SESSIONS and now - last_seen < SESSION_TTL:
+                break
+            del SESSIONS[oldest_sid]
+    return history
 
 WF_RED = "#D71921"
 WF_GOLD = "#FFCD41"
@@ -307,7 +504,8 @@ app.layout = html.Div([
                 type="text",
                 placeholder="Type your message here...",
                 style=custom_styles['text_input'],
-                n_submit=0
+                n_submit=0,
+                debounce=True
             ),
             html.Button(
                 "Send",
@@ -325,27 +523,60 @@ app.layout = html.Div([
 
         html.Br(),
 
-        dcc.Store(id="chat-history", data=[]),
         dcc.Download(id="download-pdf")
 
     ], fluid=True, style={'paddingTop': '20px', 'paddingBottom': '20px'})
 ])
 
 
-def get_chatbot_response(user_message):
-    message_lower = user_message.lower()
-    result = agent.invoke(prompt + message_lower)
+@functools.lru_cache(maxsize=256)
+def _answer(normalized_message: str) -> Any:
+    """
+    Ask the agent, which also runs the tool it picks; the answer is cached per normalized question.
+    
+    Failed invocations raise, so they are never cached.
+    """
+    result = agent.invoke(normalized_message)
+    if result.get('error'):
+        raise RuntimeError(result['error'])
+    if not result['tool_calls']:
+        # The model answered in text without calling a tool
+        return result['message'] or "I couldn't find a tool to answer that; try naming a company and a metric."
     return result['tool_calls'][0]['result']
+
+
+# One question at a time against the single local Ollama instance; other sessions queue behind it
+_LLM_LOCK = threading.Lock()
+# Sessions with a question in flight, so one user hammering Enter cannot pile up LLM calls
+_BUSY_SESSIONS = set()
+_BUSY_LOCK = threading.Lock()
+
+
+def get_chatbot_response(user_message):
+    try:
+        with _LLM_LOCK:
+            # Repeat questions skip both the LLM round trip and the tool run
+            response = _answer(" ".join(user_message.lower().split()))
+    except RuntimeError as e:
+        return str(e)
+    # Cached frames are shared between calls; hand out a copy
+    return response.copy() if isinstance(response, pd.DataFrame) else response
     
 
-def format_response_for_display(response):
-    if isinstance(response, str):
-        return html.Div([
-            html.Strong("Assistant: "),
-            html.Span(response)
-        ], style=custom_styles['bot_message'])
-    elif isinstance(response, pd.DataFrame):
-        return html.Div([
+def format_response_for_display(response, figure: Optional[go.Figure] = None):
+    """
+    Build the chat bubble for a bot answer together with its session-history record.
+
+    Args:
+        response: Agent answer: a DataFrame, a Chart spec, or anything printable.
+        figure (go.Figure): Already-built Plotly figure for a Chart, to skip rebuilding it.
+
+    Returns:
+        tuple: (html.Div for the chat container, dict to append to the session history)
+    """
+    timestamp = datetime.now().isoformat()
+    if isinstance(response, pd.DataFrame):
+        div = html.Div([
             html.Strong("Assistant: "),
             html.Br(),
             html.Div([
@@ -359,135 +590,148 @@ def format_response_for_display(response):
                 )
             ])
         ], style=custom_styles['bot_message'])
-    elif hasattr(response, 'savefig'):
-        img_buffer = io.BytesIO()
-        response.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.read()).decode()
-        plt.close(response)
-        return html.Div([
+        # History is server-side, so keep the frame itself rather than converting it to records
+        record = {
+            'type': 'bot',
+            'subtype': 'dataframe',
+            'data': response,
+            'timestamp': timestamp
+        }
+    elif isinstance(response, Chart):
+        div = html.Div([
             html.Strong("Assistant: "),
             html.Br(),
-            html.Img(
-                src=f"data:image/png;base64,{img_base64}",
-                style={'maxWidth': '100%', 'height': 'auto', 'marginTop': '10px'}
-            )
+            dcc.Graph(figure=figure if figure is not None else _chart_figure(response), style={'marginTop': '10px'})
         ], style=custom_styles['bot_message'])
+        # Keep the spec so the PDF export can rasterize it at PDF_DPI
+        record = {
+            'type': 'bot',
+            'subtype': 'chart',
+            'data': response,
+            'timestamp': timestamp
+        }
     else:
-        return html.Div([
+        div = html.Div([
             html.Strong("Assistant: "),
             html.Span(str(response))
         ], style=custom_styles['bot_message'])
+        record = {
+            'type': 'bot',
+            'subtype': 'text',
+            'data': str(response),
+            'timestamp': timestamp
+        }
+    return div, record
 
 
-def generate_pdf(history):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
+def _pdf_flowables(history):
+    """Yield the ReportLab flowables for a chat history, one message at a time"""
+    from reportlab.platypus import Paragraph, Spacer, Image, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+    
+    normal = getSampleStyleSheet()['Normal']
+    table_style = TableStyle([
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey)
+    ])
+    # Submit every chart up front so the pool rasterizes them in parallel while the text is laid out
+    chart_pngs = [
+        _PLOT_POOL.submit(_render_chart_png, item['data'], PDF_DPI)
+        for item in history if item['type'] == 'bot' and item.get('subtype') == 'chart'
+    ]
+    chart_pngs.reverse()
     for item in history:
         if item['type'] == 'user':
-            elements.append(Paragraph(f"You: {item['content']}", styles['Normal']))
-            elements.append(Spacer(1, 12))
+            yield Paragraph(f"You: {item['content']}", normal)
+            yield Spacer(1, 12)
         elif item['type'] == 'bot':
             subtype = item.get('subtype', 'text')
             if subtype == 'text':
-                elements.append(Paragraph(f"Assistant: {item['data']}", styles['Normal']))
-                elements.append(Spacer(1, 12))
+                yield Paragraph(f"Assistant: {item['data']}", normal)
+                yield Spacer(1, 12)
             elif subtype == 'dataframe':
-                df = pd.DataFrame(item['data'], columns=item['columns'])
-                tbl_data = [item['columns']] + [list(map(str, row)) for row in df.values]
+                table_df = item['data']
+                tbl_data = [table_df.columns.tolist()] + table_df.astype(str).values.tolist()
                 table = Table(tbl_data)
-                table.setStyle(TableStyle([
-                    ('GRID', (0,0), (-1,-1), 1, colors.black),
-                    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey)
-                ]))
-                elements.append(Paragraph("Assistant:", styles['Normal']))
-                elements.append(table)
-                elements.append(Spacer(1, 12))
-            elif subtype == 'image':
-                img_data = base64.b64decode(item['data'])
-                img_io = io.BytesIO(img_data)
-                elements.append(Paragraph("Assistant:", styles['Normal']))
-                elements.append(Image(img_io, width=400, height=300))
-                elements.append(Spacer(1, 12))
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer.read()
+                table.setStyle(table_style)
+                yield Paragraph("Assistant:", normal)
+                yield table
+                yield Spacer(1, 12)
+            elif subtype == 'chart':
+                yield Paragraph("Assistant:", normal)
+                yield Image(io.BytesIO(chart_pngs.pop().result()), width=400, height=300)
+                yield Spacer(1, 12)
+
+
+def generate_pdf(history) -> Path:
+    from reportlab.platypus import SimpleDocTemplate
+    from reportlab.lib.pagesizes import letter
+    
+    # ReportLab writes straight to disk, so the finished PDF is never held in a BytesIO
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        pdf_path = Path(tmp.name)
+    # Flate-compress page streams; chart-heavy exports shrink noticeably
+    doc = SimpleDocTemplate(str(pdf_path), pagesize=letter, pageCompression=1)
+    doc.build(list(_pdf_flowables(history)))
+    return pdf_path
 
 
 @app.callback(
     [Output("chat-container", "children"),
-     Output("user-input", "value"),
-     Output("chat-history", "data")],
+     Output("user-input", "value")],
     [Input("submit-button", "n_clicks"),
      Input("user-input", "n_submit")],
-    [State("user-input", "value"),
-     State("chat-container", "children"),
-     State("chat-history", "data")]
+    [State("user-input", "value")]
 )
-def update_chat(n_clicks, n_submit, user_input, chat_children, chat_history):
-    ctx = callback_context
-    if not ctx.triggered or not user_input or user_input.strip() == "":
-        return chat_children, "", chat_history
+def update_chat(n_clicks, n_submit, user_input):
+    if not user_input or not user_input.strip() or not callback_context.triggered:
+        return no_update, ""
 
     user_message_div = html.Div([
         html.Strong("You: "),
         user_input
     ], style=custom_styles['user_message'])
 
-    bot_response = get_chatbot_response(user_input)
-
-    if isinstance(bot_response, pd.DataFrame):
-        bot_message_div = format_response_for_display(bot_response)
-        store_bot = {
-            'type': 'bot',
-            'subtype': 'dataframe',
-            'columns': bot_response.columns.tolist(),
-            'data': bot_response.to_dict('records'),
-            'timestamp': datetime.now().isoformat()
-        }
-    elif hasattr(bot_response, 'savefig'):
-        img_buffer = io.BytesIO()
-        bot_response.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.read()).decode()
-        plt.close(bot_response)
-        bot_message_div = format_response_for_display(bot_response)
-        store_bot = {
-            'type': 'bot',
-            'subtype': 'image',
-            'data': img_base64,
-            'timestamp': datetime.now().isoformat()
-        }
-    else:
-        bot_message_div = format_response_for_display(bot_response)
-        store_bot = {
-            'type': 'bot',
-            'subtype': 'text',
-            'data': str(bot_response),
-            'timestamp': datetime.now().isoformat()
-        }
-
-    new_history = chat_history + [
+    sid = _session_id()
+    with _BUSY_LOCK:
+        busy = sid in _BUSY_SESSIONS
+        _BUSY_SESSIONS.add(sid)
+    if busy:
+        # Shown once but kept out of the history, so the PDF export only has real answers
+        notice = html.Div("Still working on your previous question", style=custom_styles['bot_message'])
+        updated_chat = Patch()
+        updated_chat.append(notice)
+        return updated_chat, user_input
+    try:
+        bot_response = get_chatbot_response(user_input)
+    finally:
+        with _BUSY_LOCK:
+            _BUSY_SESSIONS.discard(sid)
+    bot_message_div, store_bot = format_response_for_display(bot_response)
+
+    _session_history().extend([
         {'type': 'user', 'content': user_input, 'timestamp': datetime.now().isoformat()},
         store_bot
-    ]
+    ])
 
-    updated_chat = chat_children + [user_message_div, bot_message_div]
+    updated_chat = Patch()
+    updated_chat.extend([user_message_div, bot_message_div])
 
-    return updated_chat, "", new_history
+    return updated_chat, ""
 
 
 @app.callback(
     Output("download-pdf", "data"),
     Input("download-button", "n_clicks"),
-    State("chat-history", "data"),
     prevent_initial_call=True
 )
-def download_chat(n_clicks, history):
-    pdf_bytes = generate_pdf(history)
-    return dcc.send_bytes(pdf_bytes, filename="chat_history.pdf")
+def download_chat(n_clicks):
+    pdf_path = generate_pdf(_session_history())
+    try:
+        return dcc.send_file(str(pdf_path), filename="chat_history.pdf")
+    finally:
+        pdf_path.unlink(missing_ok=True)
 
 
 app.clientside_callback(
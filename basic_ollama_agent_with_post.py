@@ -1,10 +1,94 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import httpx
+import orjson
 import inspect
-from typing import List, Callable, Optional, Any, Dict
+from typing import List, Callable, Optional, Any, Dict, Union, get_args, get_origin
+from docstring_parser import parse as parse_docstring
 from pydantic import BaseModel
 
 
+_JSON_TYPES = {int: "integer", float: "number", bool: "boolean", list: "array", dict: "object", str: "string"}
+
+
+def _json_type(annotation: Any) -> str:
+    """
+    Map a parameter annotation to a JSON schema type, unwrapping Optional[...] and generics.
+    
+    Args:
+        annotation: Annotation from the function signature
+        
+    Returns:
+        JSON schema type name, "string" when unknown
+    """
+    if annotation is inspect.Parameter.empty:
+        return "string"
+    
+    # Optional[X] is Union[X, None]; describe X
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            annotation = args[0]
+    
+    # List[str] / list[str] -> list, Dict[...] -> dict
+    origin = get_origin(annotation)
+    if origin is not None:
+        annotation = origin
+    
+    return _JSON_TYPES.get(annotation, "string")
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_for(tool: Callable) -> Dict[str, Any]:
+    """
+    Build the tool schema for a function from its docstring and signature.
+    
+    Cached per function object, so agents sharing tools only inspect each one once.
+    
+    Args:
+        tool: Callable to describe
+        
+    Returns:
+        Tool schema dictionary
+    """
+    # Get function signature
+    sig = inspect.signature(tool)
+    
+    # Parse docstring for description and parameter info
+    docstring = inspect.getdoc(tool) or ""
+    param_desc = {param.arg_name: param.description for param in parse_docstring(docstring).params}
+    
+    # Basic schema structure
+    schema = {
+        "type": "function",
+        "function": {
+            "name": tool.__name__,
+            "description": docstring.split('\n')[0] if docstring else f"Function {tool.__name__}",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        }
+    }
+    
+    # Add parameters from function signature
+    for param_name, param in sig.parameters.items():
+        schema["function"]["parameters"]["properties"][param_name] = {
+            "type": _json_type(param.annotation),
+            "description": param_desc.get(param_name) or f"Parameter {param_name}"
+        }
+    
+        # Add to required if no default value
+        if param.default == inspect.Parameter.empty:
+            schema["function"]["parameters"]["required"].append(param_name)
+    
+    return schema
+
+
 class OllamaAgent:
     """
     A simple agent class for interacting with Ollama models with tool support and structured output.
@@ -17,6 +101,7 @@ class OllamaAgent:
         output_schema: Optional[BaseModel] = None,
         endpoint: str = "http://localhost:11434/api/chat",
         proxies: Optional[Dict[str, str]] = None,
+        system: Optional[str] = None,
     ):
         """
         Initialize the Ollama Agent.
@@ -26,14 +111,27 @@ class OllamaAgent:
             tools: List of callable functions that can be used as tools
             output_schema: Optional Pydantic model for structured JSON output
             endpoint: URL of the Ollama chat API
-            proxies: Proxy dictionary passed to ``requests.post``
+            proxies: Proxy dictionary passed to the HTTP session
+            system: Optional system prompt sent ahead of every user prompt
         """
         self.model_name = model_name
         self.tools = tools
+        self._tool_by_name = {tool.__name__: tool for tool in tools}
         self.output_schema = output_schema
         self.endpoint = endpoint
         self.proxies = proxies if proxies is not None else {"http": "", "https": ""}
+        self.system = system
         self.tool_schemas = self._generate_tool_schemas()
+        
+        # Keep-alive connection pool so each invoke reuses a socket to the Ollama server
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # Async counterpart, created on first ainvoke and tied to that call's event loop
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
     
     def _generate_tool_schemas(self) -> List[Dict[str, Any]]:
         """
@@ -42,56 +140,7 @@ class OllamaAgent:
         Returns:
             List of tool schema dictionaries
         """
-        schemas = []
-        
-        for tool in self.tools:
-            # Get function signature
-            sig = inspect.signature(tool)
-            
-            # Parse docstring for description and parameter info
-            docstring = inspect.getdoc(tool) or ""
-            
-            # Basic schema structure
-            schema = {
-                "type": "function",
-                "function": {
-                    "name": tool.__name__,
-                    "description": docstring.split('\n')[0] if docstring else f"Function {tool.__name__}",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                }
-            }
-            
-            # Add parameters from function signature
-            for param_name, param in sig.parameters.items():
-                param_type = "string"  # Default type
-                
-                # Try to infer type from annotation
-                if param.annotation != inspect.Parameter.empty:
-                    if param.annotation == int:
-                        param_type = "integer"
-                    elif param.annotation == float:
-                        param_type = "number"
-                    elif param.annotation == bool:
-                        param_type = "boolean"
-                    elif param.annotation == list:
-                        param_type = "array"
-                
-                schema["function"]["parameters"]["properties"][param_name] = {
-                    "type": param_type,
-                    "description": f"Parameter {param_name}"
-                }
-                
-                # Add to required if no default value
-                if param.default == inspect.Parameter.empty:
-                    schema["function"]["parameters"]["required"].append(param_name)
-            
-            schemas.append(schema)
-        
-        return schemas
+        return [_schema_for(tool) for tool in self.tools]
     
     def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """
@@ -104,14 +153,98 @@ class OllamaAgent:
         Returns:
             Result of the tool execution
         """
-        for tool in self.tools:
-            if tool.__name__ == tool_name:
-                try:
-                    return tool(**arguments)
-                except Exception as e:
-                    return f"Error executing {tool_name}: {str(e)}"
+        tool = self._tool_by_name.get(tool_name)
+        if tool is None:
+            return f"Tool {tool_name} not found"
         
-        return f"Tool {tool_name} not found"
+        try:
+            return tool(**arguments)
+        except Exception as e:
+            return f"Error executing {tool_name}: {str(e)}"
+    
+    def _build_request(self, prompt: str) -> Dict[str, Any]:
+        """
+        Build the Ollama chat request body for a prompt.
+        
+        Args:
+            prompt: The input prompt to send to the model
+            
+        Returns:
+            JSON-serializable request parameters
+        """
+        # A fixed system message keeps the prompt prefix identical across calls, so the
+        # server can reuse its KV-cache instead of re-processing the instructions
+        messages = [{'role': 'user', 'content': prompt}]
+        if self.system:
+            messages.insert(0, {'role': 'system', 'content': self.system})
+        
+        request_params = {
+            'model': self.model_name,
+            'messages': messages,
+            'stream': False
+        }
+        
+        # Add tools if available
+        if self.tool_schemas:
+            request_params['tools'] = self.tool_schemas
+        
+        # Add format for structured output if schema is provided
+        if self.output_schema:
+            request_params['format'] = self.output_schema.model_json_schema()
+        
+        return request_params
+    
+    def _handle_response(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run any requested tool calls and parse structured output from an Ollama response.
+        
+        Args:
+            body: Decoded JSON body returned by the Ollama chat API
+            
+        Returns:
+            Dictionary containing the response and any tool results
+        """
+        result = {
+            'message': body['message']['content'],
+            'tool_calls': [],
+            'structured_output': None
+        }
+        
+        # Handle tool calls if present
+        tool_calls = body['message'].get('tool_calls') or []
+        calls = [(tc['function']['name'], tc['function']['arguments']) for tc in tool_calls]
+        if len(calls) > 1:
+            # Independent tool calls run side by side; results are collected in request order
+            with ThreadPoolExecutor(max_workers=min(8, len(calls))) as executor:
+                futures = [executor.submit(self._execute_tool, name, args) for name, args in calls]
+                tool_results = [future.result() for future in futures]
+        else:
+            tool_results = [self._execute_tool(name, args) for name, args in calls]
+        
+        for (tool_name, tool_args), tool_result in zip(calls, tool_results):
+            result['tool_calls'].append({
+                'tool': tool_name,
+                'arguments': tool_args,
+                'result': tool_result
+            })
+        
+        # Handle structured output if schema is provided
+        if self.output_schema and result['message']:
+            try:
+                parsed_output = orjson.loads(result['message'])
+                result['structured_output'] = self.output_schema(**parsed_output)
+            except (orjson.JSONDecodeError, ValueError) as e:
+                result['structured_output'] = f"Failed to parse structured output: {str(e)}"
+        
+        return result
+    
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        return {
+            'error': f"Failed to invoke model: {str(e)}",
+            'message': None,
+            'tool_calls': [],
+            'structured_output': None
+        }
     
     def invoke(self, prompt: str) -> Dict[str, Any]:
         """
@@ -124,68 +257,71 @@ class OllamaAgent:
             Dictionary containing the response and any tool results
         """
         try:
-            # Prepare the request
-            request_params = {
-                'model': self.model_name,
-                'messages': [{'role': 'user', 'content': prompt}],
-                'stream': False
-            }
-            
-            # Add tools if available
-            if self.tool_schemas:
-                request_params['tools'] = self.tool_schemas
-            
-            # Add format for structured output if schema is provided
-            if self.output_schema:
-                request_params['format'] = self.output_schema.model_json_schema()
-            
-            # Make the request to Ollama
-            response = requests.post(
+            # Make the request to Ollama over the pooled session
+            http_resp = self._session.post(
                 self.endpoint,
-                json=request_params,
+                data=orjson.dumps(self._build_request(prompt)),
+                headers={'Content-Type': 'application/json'},
                 proxies=self.proxies,
             )
-            response.raise_for_status()
-            response = response.json()
-            
-            result = {
-                'message': response['message']['content'],
-                'tool_calls': [],
-                'structured_output': None
-            }
-            
-            # Handle tool calls if present
-            if 'tool_calls' in response['message']:
-                for tool_call in response['message']['tool_calls']:
-                    tool_name = tool_call['function']['name']
-                    tool_args = tool_call['function']['arguments']
-                    
-                    # Execute the tool
-                    tool_result = self._execute_tool(tool_name, tool_args)
-                    
-                    result['tool_calls'].append({
-                        'tool': tool_name,
-                        'arguments': tool_args,
-                        'result': tool_result
-                    })
+            http_resp.raise_for_status()
+            return self._handle_response(orjson.loads(http_resp.content))
             
-            # Handle structured output if schema is provided
-            if self.output_schema and result['message']:
-                try:
-                    parsed_output = json.loads(result['message'])
-                    result['structured_output'] = self.output_schema(**parsed_output)
-                except (json.JSONDecodeError, ValueError) as e:
-                    result['structured_output'] = f"Failed to parse structured output: {str(e)}"
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Long-lived pooled AsyncClient for the running event loop, rebuilt only if the loop changes.
+        
+        Returns:
+            Shared httpx.AsyncClient
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client.is_closed or self._async_loop is not loop:
+            # Empty proxy entries mean "no proxy", same as for the requests session
+            proxy = self.proxies.get("https") or self.proxies.get("http")
+            client_kwargs = {"proxy": proxy} if proxy else {"trust_env": False}
+            self._async_client = httpx.AsyncClient(
+                timeout=None,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+                **client_kwargs
+            )
+            self._async_loop = loop
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """
+        Close the pooled async client, if one was opened.
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+    
+    async def ainvoke(self, prompt: str) -> Dict[str, Any]:
+        """
+        Async version of invoke, so concurrent chats do not block a worker while the model runs.
+        
+        Args:
+            prompt: The input prompt to send to the model
             
-            return result
+        Returns:
+            Dictionary containing the response and any tool results
+        """
+        try:
+            # Pooled across calls, like the requests session on the sync side
+            http_resp = await self._get_async_client().post(
+                self.endpoint,
+                content=orjson.dumps(self._build_request(prompt)),
+                headers={'Content-Type': 'application/json'},
+            )
+            http_resp.raise_for_status()
+            # Tools stay synchronous
+            return self._handle_response(orjson.loads(http_resp.content))
             
         except Exception as e:
-            return {
-                'error': f"Failed to invoke model: {str(e)}",
-                'message': None,
-                'tool_calls': [],
-                'structured_output': None
-            }
+            return self._error_result(e)
 
 
 # Example usage:
@@ -0,0 +1,97 @@
+"""
+XBRL us-gaap tags behind the target bank metrics
+
+Kept free of heavy imports, so scripts that only need the tag set can use it without
+pulling in the extractor and its dependencies.
+"""
+from typing import Dict, List, Tuple
+
+
+# Comprehensive GAAP tags mapping to our 50 target metrics
+GAAP_MAPPING = {
+    # TIER 1: Core Profitability & Performance
+    'NetIncome': ['NetIncomeLoss', 'ProfitLoss', 'NetIncomeLossAvailableToCommonStockholdersBasic', 'IncomeLossFromContinuingOperations'],
+    'TotalRevenue': ['Revenues', 'RevenueFromContractWithCustomerExcludingAssessedTax', 'InterestAndDividendIncomeOperating', 'TotalRevenues'],
+    'NetInterestIncome': ['InterestIncomeExpenseNet', 'NetInterestIncome', 'InterestIncomeExpenseAfterProvisionForLoanLoss'],
+    'ReturnOnEquity': ['ReturnOnAverageEquity', 'ReturnOnEquity'],
+    'ReturnOnAssets': ['ReturnOnAverageAssets', 'ReturnOnAssets'],
+    'EarningsPerShare': ['EarningsPerShareBasic', 'IncomeLossFromContinuingOperationsPerBasicShare'],
+    'EarningsPerShareDiluted': ['EarningsPerShareDiluted', 'IncomeLossFromContinuingOperationsPerDilutedShare'],
+
+    # TIER 2: Capital & Balance Sheet Strength
+    'TotalAssets': ['Assets', 'AssetsCurrent', 'AssetsNoncurrent'],
+    'ShareholdersEquity': ['StockholdersEquity', 'StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest', 'EquityAttributableToParent'],
+    'TotalDeposits': ['Deposits', 'DepositsTotal', 'InterestBearingDeposits', 'NoninterestBearingDeposits'],
+    'TotalLoans': ['LoansAndLeasesReceivableNetOfAllowance', 'LoansAndLeasesReceivableGross', 'LoansReceivableNet'],
+    'BookValuePerShare': ['BookValuePerShare', 'StockholdersEquityPerShare'],
+    'TangibleBookValuePerShare': ['TangibleBookValuePerShare'],
+    'Tier1CapitalRatio': ['Tier1CapitalRatio', 'CapitalAdequacyTier1CapitalRatio'],
+
+    # TIER 3: Risk Management & Credit Quality
+    'ProvisionForLoanLosses': ['ProvisionForLoanAndLeaseLosses', 'ProvisionForCreditLosses', 'ProvisionForDoubtfulAccounts'],
+    'AllowanceForLoanLosses': ['AllowanceForLoanAndLeaseLosses', 'AllowanceForCreditLossesFinancingReceivables'],
+    'NonPerformingLoans': ['LoansAndLeasesReceivableNonaccrual', 'NonperformingLoans'],
+    'ChargeOffs': ['LoansAndLeasesReceivableChargeOffs', 'ChargeOffsLoansAndLeases'],
+    'LoanLossReserveRatio': ['LoanLossReserveRatio'],
+    'NonPerformingAssetRatio': ['NonperformingAssetRatio'],
+
+    # TIER 4: Income Statement Detail
+    'InterestIncome': ['InterestAndFeeIncomeLoansAndLeases', 'InterestIncomeOperating', 'InterestAndDividendIncomeOperating', 'InterestIncomeLoansAndLeases'],
+    'InterestExpense': ['InterestExpense', 'InterestExpenseDeposits', 'InterestExpenseDebt', 'InterestExpenseBorrowings'],
+    'NonInterestIncome': ['NoninterestIncome', 'RevenuesExcludingInterestAndDividends', 'FeesAndCommissions'],
+    'NonInterestExpense': ['NoninterestExpense', 'OperatingExpenses', 'GeneralAndAdministrativeExpense'],
+    'OperatingExpenses': ['OperatingExpenses', 'CostsAndExpenses', 'OperatingCostsAndExpenses'],
+    'PersonnelExpense': ['LaborAndRelatedExpense', 'EmployeeRelatedExpense', 'SalariesAndWages'],
+    'OccupancyExpense': ['OccupancyNet', 'OccupancyAndEquipmentExpense'],
+
+    # TIER 5: Operational Efficiency
+    'EfficiencyRatio': ['EfficiencyRatio'],
+    'NetInterestMargin': ['NetInterestMargin'],
+    'CostOfFunds': ['CostOfFunds'],
+    'AssetTurnover': ['AssetTurnover'],
+    'OperatingLeverage': ['OperatingLeverage'],
+
+    # TIER 6: Growth & Market Metrics
+    'TotalRevenueGrowth': ['RevenueGrowthRate'],
+    'LoanGrowth': ['LoanGrowthRate'],
+    'DepositGrowth': ['DepositGrowthRate'],
+    'TangibleEquityRatio': ['TangibleEquityRatio'],
+    'LeverageRatio': ['LeverageRatio', 'DebtToEquityRatio'],
+
+    # TIER 7: Trading & Investment Banking
+    'TradingRevenue': ['TradingGainsLosses', 'TradingAccountProfitLoss', 'SecuritiesGainLoss'],
+    'InvestmentBankingRevenue': ['InvestmentBankingRevenue', 'UnderwritingIncome'],
+    'TrustAndInvestmentFees': ['TrustFeesRevenue', 'InvestmentManagementAndTrustFees'],
+    'ServiceCharges': ['ServiceChargesOnDepositAccounts', 'ServiceCharges'],
+    'CardRevenue': ['CreditCardIncome', 'CreditCardFees'],
+
+    # TIER 8: Regulatory & Capital Management
+    'CommonEquityTier1Ratio': ['CommonEquityTier1CapitalRatio', 'Tier1CommonCapitalRatio'],
+    'TotalCapitalRatio': ['TotalCapitalRatio', 'CapitalAdequacyTotalCapitalRatio'],
+    'RiskWeightedAssets': ['RiskWeightedAssets'],
+    'LeverageCapitalRatio': ['LeverageRatio', 'CapitalAdequacyLeverageRatio'],
+    'LiquidityRatio': ['LiquidityRatio', 'LiquidityCoverageRatio'],
+
+    # TIER 9: Additional Balance Sheet Items
+    'TradingAssets': ['TradingSecuritiesDebt', 'TradingSecuritiesEquity', 'TradingSecurities'],
+    'AvailableForSaleSecurities': ['AvailableForSaleSecuritiesDebtSecurities', 'MarketableSecuritiesAvailableForSale'],
+    'HeldToMaturitySecurities': ['HeldToMaturitySecurities', 'DebtSecuritiesHeldToMaturity'],
+    'Goodwill': ['Goodwill'],
+    'IntangibleAssets': ['IntangibleAssetsNetExcludingGoodwill', 'FiniteLivedIntangibleAssetsNet']
+}
+
+
+def _invert_gaap_mapping(mapping: Dict[str, List[str]]) -> Dict[str, Tuple[Tuple[str, int], ...]]:
+    """
+    Invert target -> [tags] into tag -> ((target, priority), ...); lower priority wins
+    """
+    tag_targets = {}
+    for target_metric, possible_tags in mapping.items():
+        for rank, tag in enumerate(possible_tags):
+            tag_targets[tag] = tag_targets.get(tag, ()) + ((target_metric, rank),)
+    return tag_targets
+
+
+# Inverse index: tag -> ((target_metric, tag_priority), ...). A few tags feed more than one
+# target (OperatingExpenses, LeverageRatio), so each tag maps to a tuple
+TAG_TARGETS = _invert_gaap_mapping(GAAP_MAPPING)
@@ -1,67 +1,238 @@
+import asyncio
+import hashlib
+import json
 import os
-from typing import Dict, Any
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain_core.tools import tool
+import re
+from typing import Dict, Any, Iterator, List, Optional
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
-from langchain import hub
+from pydantic import BaseModel
+
+try:
+    # RE2 matches each metric's synonym alternation in one linear-time pass; stdlib re is the fallback
+    import re2 as _regex
+except ImportError:
+    _regex = re
 
 # os.environ["OPENAI_API_KEY"] = "your-api-key-here"
 
+# Repeat (model, prompt) pairs are answered from disk instead of the provider
+_LLM_CACHE_PATH = os.path.expanduser("~/.cache/metric_extractor/llm.db")
+os.makedirs(os.path.dirname(_LLM_CACHE_PATH), exist_ok=True)
+set_llm_cache(SQLiteCache(database_path=_LLM_CACHE_PATH))
+
+# Optional embedding cache (GPTCache) so paraphrased metric names ("NII" vs "Net Interest Income")
+# hit the same entry. Kept per report so answers never leak between documents.
+_SEMANTIC_CACHE_DIR = os.path.expanduser("~/.cache/metric_extractor/semantic")
+_SEMANTIC_SIMILARITY_THRESHOLD = 0.85
+
+# Alternate spellings searched for when narrowing the report to the passages around a metric
+METRIC_SYNONYMS: Dict[str, List[str]] = {
+    "Net Interest Income": ["net interest income", "NII", "net interest"],
+    "Return on Equity": ["return on equity", "ROE", "return on average equity"],
+    "Return on Tangible Common Equity": ["return on tangible common equity", "ROTCE"],
+    "Earnings Per Share": ["earnings per share", "EPS", "diluted earnings"],
+    "Tier 1 Capital Ratio": ["tier 1 capital ratio", "tier 1", "CET1", "common equity tier 1"],
+    "Net Income": ["net income", "net earnings"],
+    "Efficiency Ratio": ["efficiency ratio", "overhead ratio"],
+    "Provision for Credit Losses": ["provision for credit losses", "credit loss provision"],
+}
+
+# Instructions first and the (possibly narrowed) report text last, so the provider's
+# prompt-prefix cache reuses everything up to the text; batch calls send the full report,
+# which is then identical across follow-up questions on the same PDF
+_REPORT_SYSTEM_PROMPT = """You are a financial analyst. Extract the metrics requested by the user from this earnings report.
+
+INSTRUCTIONS:
+1. Find the exact value for each requested metric in the text
+2. Include the numerical value with units (millions, billions, %, etc.)
+3. If found, also include any period comparison (YoY, QoQ)
+4. If a metric is not found, set found to false and leave the value empty
+5. Be precise and include context if helpful
+
+EARNINGS REPORT TEXT:
+{text}
+"""
+
+
+class MetricResult(BaseModel):
+    """A single metric as extracted from an earnings report"""
+    metric: str
+    value: str
+    unit: Optional[str] = None
+    period_comparison: Optional[str] = None
+    found: bool
+
+
+class MetricResults(BaseModel):
+    """Several metrics extracted from the same report in one call"""
+    results: List[MetricResult]
+
+
 class SimpleMetricExtractor:
-    def __init__(self, model_name: str = "gpt-4"):
-        self.llm = ChatOpenAI(model=model_name, temperature=0)
-        self.tools = self._create_tools()
-        self.agent = self._create_agent()
-        
-    def _create_tools(self):
-        @tool
-        def load_pdf_content(file_path: str) -> str:
-            """Load PDF content from file path and return as string"""
-            try:
-                # Replace with your actual PDF loading implementation
-                return f"PDF content loaded from {file_path}. This contains the earnings report text."
-            except Exception as e:
-                return f"Error loading PDF: {str(e)}"
-        
-        @tool  
-        def extract_specific_metric(text: str, metric_name: str) -> str:
-            """Extract a specific financial metric from the earnings report text using LLM"""
-            
-            prompt_text = f"""
-            You are a financial analyst. Extract the specific metric requested from this earnings report.
-            
-            METRIC TO FIND: {metric_name}
-            
-            EARNINGS REPORT TEXT:
-            {text}
-            
-            INSTRUCTIONS:
-            1. Find the exact value for "{metric_name}" in the text
-            2. Include the numerical value with units (millions, billions, %, etc.)
-            3. If found, also include any period comparison (YoY, QoQ)
-            4. If not found, return "Metric not found in document"
-            5. Be precise and include context if helpful
-            
-            Return format: "Metric: [value] [additional context if relevant]"
-            """
+    def __init__(
+        self,
+        model_name: str = "gpt-4",
+        max_concurrency: int = 5,
+        use_cache: bool = True,
+        semantic_cache: bool = False
+    ):
+        # cache=None uses the global SQLite cache; cache=False bypasses it for freshness-critical runs
+        cache = None if use_cache else False
+        if model_name.startswith("local:"):
+            # "local:/path/to/model.Q4_K_M.gguf" runs a quantized model in-process instead of calling a provider
+            from langchain_community.chat_models import ChatLlamaCpp
+            self.llm = ChatLlamaCpp(
+                model_path=model_name[len("local:"):],
+                n_gpu_layers=-1,
+                n_batch=512,
+                n_ctx=8192,
+                temperature=0,
+                cache=cache
+            )
+        else:
+            self.llm = ChatOpenAI(model=model_name, temperature=0, cache=cache)
+        # Structured output: the provider returns typed JSON, no prose to parse
+        self._metric_llm = self.llm.with_structured_output(MetricResult)
+        self._batch_llm = self.llm.with_structured_output(MetricResults)
+        self._pdf_cache: Dict[str, str] = {}
+        self.semantic_cache = semantic_cache
+        self._semantic_caches: Dict[str, Any] = {}
+        # One synonym regex per metric, compiled on first use
+        self._metric_regexes: Dict[str, Any] = {}
+        # Caps in-flight provider calls for aextract_metric to avoid 429s
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        
+    def _load_pdf(self, file_path: str) -> str:
+        """Return the text of a PDF, parsing each path only once per extractor"""
+        text = self._pdf_cache.get(file_path)
+        if text is None:
+            # Replace with your actual PDF loading implementation
+            text = f"PDF content loaded from {file_path}. This contains the earnings report text."
+            self._pdf_cache[file_path] = text
+        return text
+    
+    def _metric_regex(self, metric_name: str):
+        """Return the compiled synonym regex for one metric, compiling it on first use"""
+        metric_regex = self._metric_regexes.get(metric_name)
+        if metric_regex is None:
+            # Longest synonym first so "net interest income" wins over "net interest"
+            terms = sorted(METRIC_SYNONYMS.get(metric_name, [metric_name]), key=len, reverse=True)
+            escaped = (r"\s+".join(re.escape(word) for word in term.split()) for term in terms)
+            metric_regex = _regex.compile("(?i)" + "|".join(rf"\b{term}\b" for term in escaped))
+            self._metric_regexes[metric_name] = metric_regex
+        return metric_regex
+    
+    def _oracle_window(self, text: str, metric_names: List[str], radius: int = 400) -> str:
+        """
+        Narrow the report to the passages that mention any of the given metrics
+        
+        Args:
+            text (str): Full report text
+            metric_names (List[str]): Metrics being extracted
+            radius (int): Characters of context kept on each side of a match
             
-            try:
-                response = self.llm.invoke(prompt_text)
-                return response.content
-            except Exception as e:
-                return f"Extraction failed: {str(e)}"
-        
-        return [load_pdf_content, extract_specific_metric]
-    
-    def _create_agent(self):
-        prompt = hub.pull("hwchase17/react")
-        agent = create_react_agent(self.llm, self.tools, prompt)
-        return AgentExecutor(
-            agent=agent, 
-            tools=self.tools, 
-            verbose=True, 
-            max_iterations=5
+        Returns:
+            The merged windows around every match, or the full text if nothing matches
+        """
+        # Each metric is matched on its own, so one metric's synonym (e.g. "net earnings")
+        # cannot swallow text another metric needs ("net earnings per share")
+        matches = sorted(
+            (match.start(), match.end())
+            for name in dict.fromkeys(metric_names)
+            for match in self._metric_regex(name).finditer(text)
         )
+        
+        spans = []
+        for match_start, match_end in matches:
+            start, end = max(0, match_start - radius), match_end + radius
+            if spans and start <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+        
+        if not spans:
+            return text
+        return "\n...\n".join(text[start:end] for start, end in spans)
+    
+    def _report_messages(self, text: str, question: str) -> list:
+        return [
+            SystemMessage(content=_REPORT_SYSTEM_PROMPT.format(text=text)),
+            HumanMessage(content=question)
+        ]
+    
+    def _semantic_cache_for(self, text: str) -> Optional[Any]:
+        """Return the GPTCache instance for this report, or None when semantic caching is off"""
+        if not self.semantic_cache:
+            return None
+        
+        report_key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        cache_obj = self._semantic_caches.get(report_key)
+        if cache_obj is None:
+            from gptcache import Cache, Config
+            from gptcache.adapter.api import init_similar_cache
+            from gptcache.embedding import OpenAI as OpenAIEmbedding
+            from gptcache.manager import manager_factory
+            from gptcache.similarity_evaluation.distance import SearchDistanceEvaluation
+            
+            data_dir = os.path.join(_SEMANTIC_CACHE_DIR, report_key)
+            embedding = OpenAIEmbedding()
+            cache_obj = Cache()
+            init_similar_cache(
+                data_dir=data_dir,
+                cache_obj=cache_obj,
+                embedding=embedding,
+                data_manager=manager_factory("sqlite,faiss", data_dir=data_dir, vector_params={"dimension": embedding.dimension}),
+                evaluation=SearchDistanceEvaluation(),
+                config=Config(similarity_threshold=_SEMANTIC_SIMILARITY_THRESHOLD)
+            )
+            self._semantic_caches[report_key] = cache_obj
+        return cache_obj
+    
+    def _extract_specific_metric(self, text: str, metric_name: str) -> MetricResult:
+        semantic_cache = self._semantic_cache_for(text)
+        if semantic_cache is not None:
+            from gptcache.adapter.api import get as semantic_get
+            cached = semantic_get(metric_name, cache_obj=semantic_cache)
+            if cached is not None:
+                return MetricResult.model_validate_json(cached)
+        
+        window = self._oracle_window(text, [metric_name])
+        result = self._metric_llm.invoke(self._report_messages(window, f"Extract: {metric_name}"))
+        
+        if semantic_cache is not None:
+            from gptcache.adapter.api import put as semantic_put
+            semantic_put(metric_name, result.model_dump_json(), cache_obj=semantic_cache)
+        return result
+    
+    async def _aextract_specific_metric(self, text: str, metric_name: str) -> MetricResult:
+        semantic_cache = self._semantic_cache_for(text)
+        if semantic_cache is not None:
+            from gptcache.adapter.api import get as semantic_get
+            cached = semantic_get(metric_name, cache_obj=semantic_cache)
+            if cached is not None:
+                return MetricResult.model_validate_json(cached)
+        
+        window = self._oracle_window(text, [metric_name])
+        result = await self._metric_llm.ainvoke(self._report_messages(window, f"Extract: {metric_name}"))
+        
+        if semantic_cache is not None:
+            from gptcache.adapter.api import put as semantic_put
+            semantic_put(metric_name, result.model_dump_json(), cache_obj=semantic_cache)
+        return result
+    
+    def _extract_specific_metric_stream(self, text: str, metric_name: str) -> Iterator[str]:
+        # Plain (unstructured) model so text chunks can be shown as soon as they are generated
+        window = self._oracle_window(text, [metric_name])
+        for chunk in self.llm.stream(self._report_messages(window, f"Extract: {metric_name}")):
+            if chunk.content:
+                yield chunk.content
+    
+    def _extract_metrics_batch(self, text: str, metric_names: List[str]) -> List[MetricResult]:
+        question = f"Extract each of the following metrics: {json.dumps(metric_names)}"
+        return self._batch_llm.invoke(self._report_messages(text, question)).results
     
     def extract_metric(self, pdf_file_path: str, metric_name: str, bank_name: str = "") -> Dict[str, Any]:
         """
@@ -76,23 +247,61 @@ class SimpleMetricExtractor:
             Dict with extraction results
         """
         
-        query = f"""
-        Extract the metric "{metric_name}" from {bank_name}'s earnings report.
+        try:
+            text = self._load_pdf(pdf_file_path)
+            result = self._extract_specific_metric(text, metric_name)
+            return {
+                "success": True,
+                "bank_name": bank_name,
+                "metric_requested": metric_name,
+                "result": result,
+                "file_path": pdf_file_path
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "bank_name": bank_name,
+                "metric_requested": metric_name,
+                "file_path": pdf_file_path
+            }
+    
+    def extract_metric_stream(self, pdf_file_path: str, metric_name: str) -> Iterator[str]:
+        """
+        Stream the answer for a single metric as it is generated, for chat-style displays
         
-        Steps:
-        1. Load the PDF content from: {pdf_file_path}
-        2. Extract the specific metric "{metric_name}" from the loaded content
+        Args:
+            pdf_file_path (str): Path to the PDF earnings report
+            metric_name (str): Name of the metric to extract (e.g., "Net Interest Income", "ROE", "EPS")
+            
+        Yields:
+            Text chunks of the model's answer
+        """
+        text = self._load_pdf(pdf_file_path)
+        yield from self._extract_specific_metric_stream(text, metric_name)
+    
+    async def aextract_metric(self, pdf_file_path: str, metric_name: str, bank_name: str = "") -> Dict[str, Any]:
+        """
+        Async version of extract_metric, so several metrics can be extracted concurrently
         
-        Focus on finding the exact value with proper context.
+        Args:
+            pdf_file_path (str): Path to the PDF earnings report
+            metric_name (str): Name of the metric to extract (e.g., "Net Interest Income", "ROE", "EPS")
+            bank_name (str): Name of the bank (optional)
+            
+        Returns:
+            Dict with extraction results
         """
         
         try:
-            result = self.agent.invoke({"input": query})
+            text = self._load_pdf(pdf_file_path)
+            async with self._semaphore:
+                result = await self._aextract_specific_metric(text, metric_name)
             return {
                 "success": True,
                 "bank_name": bank_name,
                 "metric_requested": metric_name,
-                "result": result.get("output", ""),
+                "result": result,
                 "file_path": pdf_file_path
             }
         except Exception as e:
@@ -104,6 +313,39 @@ class SimpleMetricExtractor:
                 "file_path": pdf_file_path
             }
 
+    def extract_metrics_batch(self, pdf_file_path: str, metric_names: List[str], bank_name: str = "") -> Dict[str, Any]:
+        """
+        Extract several metrics from a bank's earnings report with a single LLM call
+        
+        Args:
+            pdf_file_path (str): Path to the PDF earnings report
+            metric_names (List[str]): Names of the metrics to extract
+            bank_name (str): Name of the bank (optional)
+            
+        Returns:
+            Dict with extraction results, with "results" as a list of MetricResult
+        """
+        
+        try:
+            # The report text is sent once for all metrics instead of once per metric
+            text = self._load_pdf(pdf_file_path)
+            results = self._extract_metrics_batch(text, metric_names)
+            return {
+                "success": True,
+                "bank_name": bank_name,
+                "metrics_requested": metric_names,
+                "results": results,
+                "file_path": pdf_file_path
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "bank_name": bank_name,
+                "metrics_requested": metric_names,
+                "file_path": pdf_file_path
+            }
+
 # Example usage
 def main():
     extractor = SimpleMetricExtractor()
@@ -122,15 +364,18 @@ def main():
     
     print(f"🏦 Extracting metrics from {bank}'s earnings report\n")
     
-    for metric in metrics_to_extract:
-        print(f"🔍 Extracting: {metric}")
-        result = extractor.extract_metric(pdf_path, metric, bank)
-        
-        if result["success"]:
-            print(f"✅ {result['result']}")
-        else:
-            print(f"❌ Failed: {result['error']}")
-        print("-" * 50)
+    result = extractor.extract_metrics_batch(pdf_path, metrics_to_extract, bank)
+    
+    if result["success"]:
+        for metric in result["results"]:
+            print(f"🔍 {metric.metric}")
+            if metric.found:
+                print(f"✅ {metric.value} {metric.unit or ''} {metric.period_comparison or ''}".rstrip())
+            else:
+                print("❌ Metric not found in document")
+            print("-" * 50)
+    else:
+        print(f"❌ Failed: {result['error']}")
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,17 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback_context
+from dash import dcc, html, dash_table, Input, Output, State, Patch, callback_context, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import base64
+import functools
+try:
+    import pybase64 as b64  # SIMD base64, several times faster on chart-sized payloads
+except ImportError:
+    import base64 as b64
 import io
+import re
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
@@ -19,7 +24,7 @@ WF_RED = "#D71921"
 WF_GOLD = "#FFCD41"
 WF_DARK_RED = "#B71C1C"
 
-# Custom CSS styles
+# Custom CSS styles for the layout; chat bubbles are classes in assets/chat.css
 custom_styles = {
     'navbar': {
         'backgroundColor': WF_RED,
@@ -46,25 +51,6 @@ custom_styles = {
         'backgroundColor': '#f8f9fa',
         'marginBottom': '20px'
     },
-    'user_message': {
-        'backgroundColor': WF_RED,
-        'color': 'white',
-        'padding': '10px 15px',
-        'borderRadius': '18px 18px 5px 18px',
-        'marginBottom': '10px',
-        'marginLeft': '20%',
-        'wordWrap': 'break-word'
-    },
-    'bot_message': {
-        'backgroundColor': 'white',
-        'color': '#333',
-        'padding': '10px 15px',
-        'borderRadius': '18px 18px 18px 5px',
-        'marginBottom': '10px',
-        'marginRight': '20%',
-        'border': f'1px solid {WF_RED}',
-        'wordWrap': 'break-word'
-    },
     'input_container': {
         'display': 'flex',
         'gap': '10px',
@@ -90,6 +76,8 @@ custom_styles = {
     }
 }
 
+GREETING = "Hello! I'm your Earnings Research assistant. Ask me anything about financial data, earnings analysis, or request charts and reports."
+
 # Layout
 app.layout = html.Div([
     # Navigation Bar
@@ -101,14 +89,14 @@ app.layout = html.Div([
     dbc.Container([
         html.Br(),
         
-        # Chat Container
+        # Chat Container; update_chat appends to it in place
         html.Div(
             id="chat-container",
             children=[
                 html.Div([
                     html.Strong("Assistant: "),
-                    "Hello! I'm your Earnings Research assistant. Ask me anything about financial data, earnings analysis, or request charts and reports."
-                ], style=custom_styles['bot_message'])
+                    GREETING
+                ], className='wf-bot-msg')
             ],
             style=custom_styles['chat_container']
         ),
@@ -132,112 +120,161 @@ app.layout = html.Div([
         
         html.Br(),
         
-        # Hidden div to store chat history
-        dcc.Store(id="chat-history", data=[]),
+        # Hidden store holding the chat history records, greeting included
+        dcc.Store(id="chat-history", data=[
+            {"type": "bot", "kind": "text", "content": GREETING}
+        ]),
         
     ], fluid=True, style={'paddingTop': '20px', 'paddingBottom': '20px'})
 ])
 
+# Keyword dispatch for the mock bot, compiled once; no word boundaries so "charts" still counts as "chart"
+_CHART_KW = re.compile(r"chart|plot|graph", re.I)
+_TABLE_KW = re.compile(r"dataframe|data|table", re.I)
+
+_TEXT_RESPONSES = {
+    "hello": "Hello! How can I help you with earnings research today?",
+    "revenue": "Wells Fargo's revenue has shown steady growth over the past quarters, primarily driven by net interest income and fee-based services.",
+    "earnings": "Recent earnings reports show strong performance with consistent EPS growth and improved efficiency ratios.",
+    "help": "I can help you with:\n• Financial data analysis\n• Earnings trend charts\n• Revenue breakdowns\n• Comparative analysis\n• Custom reports\n\nJust ask me what you'd like to know!"
+}
+_RESP_KW = re.compile("|".join(_TEXT_RESPONSES), re.I)
+
+def _plot_wf_revenue_trend():
+    """Mock revenue trend chart as a native Plotly figure"""
+    # Sample data
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
+    revenue = [100, 120, 130, 110, 140, 160]
+    
+    return go.Figure(
+        data=[go.Scatter(x=months, y=revenue, mode='lines+markers',
+                         line=dict(color=WF_RED, width=2), marker=dict(size=8))],
+        layout=go.Layout(
+            title='Wells Fargo Revenue Trend',
+            xaxis_title='Month',
+            yaxis_title='Revenue (Millions $)',
+            plot_bgcolor='#f8f9fa'
+        )
+    )
+
+@functools.lru_cache(maxsize=1)
+def _mock_table():
+    """Build the mock quarterly table once; callers get a copy"""
+    data = {
+        'Quarter': ['Q1 2024', 'Q2 2024', 'Q3 2024', 'Q4 2024'],
+        'Revenue ($M)': [20500, 21300, 20860, 21200],
+        'Net Income ($M)': [4600, 4800, 4500, 4700],
+        'EPS ($)': [1.25, 1.30, 1.22, 1.28]
+    }
+    return pd.DataFrame(data)
+
+@functools.lru_cache(maxsize=256)
+def _resolve_text(msg_lower):
+    """Canned text reply for a lowercased message, or None when nothing matches"""
+    match = _RESP_KW.search(msg_lower)
+    return _TEXT_RESPONSES[match.group(0)] if match else None
+
 # Mock function to simulate your chatbot response function
 def get_chatbot_response(user_message):
     """
     Mock function that simulates your actual chatbot response.
-    Replace this with your actual function that returns text, DataFrame, or matplotlib figure.
-    """
-    message_lower = user_message.lower()
+    Replace this with your actual function that returns text, DataFrame, Plotly or matplotlib figure.
     
-    if "chart" in message_lower or "plot" in message_lower or "graph" in message_lower:
-        # Return a matplotlib figure
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Sample data
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-        revenue = [100, 120, 130, 110, 140, 160]
-        
-        ax.plot(months, revenue, marker='o', linewidth=2, markersize=8, color=WF_RED)
-        ax.set_title('Wells Fargo Revenue Trend', fontsize=16, fontweight='bold')
-        ax.set_ylabel('Revenue (Millions $)', fontsize=12)
-        ax.set_xlabel('Month', fontsize=12)
-        ax.grid(True, alpha=0.3)
-        ax.set_facecolor('#f8f9fa')
-        
-        plt.tight_layout()
-        return fig
+    Repeated queries are served from cache: canned text and tables (as a fresh copy).
+    """
+    if _CHART_KW.search(user_message):
+        # Plotly figure, shipped to the browser as JSON
+        return _plot_wf_revenue_trend()
         
-    elif "data" in message_lower or "table" in message_lower or "dataframe" in message_lower:
-        # Return a pandas DataFrame
-        data = {
-            'Quarter': ['Q1 2024', 'Q2 2024', 'Q3 2024', 'Q4 2024'],
-            'Revenue ($M)': [20500, 21300, 20860, 21200],
-            'Net Income ($M)': [4600, 4800, 4500, 4700],
-            'EPS ($)': [1.25, 1.30, 1.22, 1.28]
-        }
-        return pd.DataFrame(data)
+    elif _TABLE_KW.search(user_message):
+        return _mock_table().copy()
         
     else:
         # Return text response
-        responses = {
-            "hello": "Hello! How can I help you with earnings research today?",
-            "revenue": "Wells Fargo's revenue has shown steady growth over the past quarters, primarily driven by net interest income and fee-based services.",
-            "earnings": "Recent earnings reports show strong performance with consistent EPS growth and improved efficiency ratios.",
-            "help": "I can help you with:\n• Financial data analysis\n• Earnings trend charts\n• Revenue breakdowns\n• Comparative analysis\n• Custom reports\n\nJust ask me what you'd like to know!"
-        }
-        
-        for key, response in responses.items():
-            if key in message_lower:
-                return response
+        text = _resolve_text(user_message.lower())
+        if text is not None:
+            return text
                 
         return f"I understand you're asking about: '{user_message}'. This is a mock response. In the actual implementation, your chatbot function would process this query and return appropriate financial analysis, data, or visualizations."
 
-def format_response_for_display(response):
-    """Convert different response types to displayable format"""
+def response_to_record(response):
+    """Convert a chatbot response to a JSON-friendly chat-history record"""
     if isinstance(response, str):
-        # Text response
-        return html.Div([
-            html.Strong("Assistant: "),
-            html.Span(response)
-        ], style=custom_styles['bot_message'])
+        return {"type": "bot", "kind": "text", "content": response}
         
     elif isinstance(response, pd.DataFrame):
+        return {"type": "bot", "kind": "table", "content": {
+            "columns": [str(col) for col in response.columns],
+            "data": response.rename(columns=str).to_dict('records')
+        }}
+        
+    elif isinstance(response, go.Figure):  # plotly figure
+        return {"type": "bot", "kind": "figure", "content": response.to_plotly_json()}
+        
+    elif hasattr(response, 'savefig'):  # matplotlib figure
+        # Convert matplotlib figure to base64 image; figures arrive sized and laid out
+        # (tight_layout), so print at their own dpi without the extra tight-bbox render pass
+        img_buffer = io.BytesIO()
+        response.canvas.print_png(img_buffer)
+        img_buffer.seek(0)
+        img_base64 = b64.b64encode(img_buffer.read()).decode('ascii')
+        plt.close(response)  # Close figure to free memory
+        return {"type": "bot", "kind": "image", "content": img_base64}
+    
+    else:
+        # Fallback for unknown response types
+        return {"type": "bot", "kind": "text", "content": str(response)}
+
+def render_record(record):
+    """Convert a chat-history record to a displayable Div"""
+    if record["type"] == "user":
+        return html.Div([
+            html.Strong("You: "),
+            record["content"]
+        ], className='wf-user-msg')
+    
+    kind, content = record.get("kind", "text"), record["content"]
+    if kind == "table":
         # DataFrame response
         return html.Div([
             html.Strong("Assistant: "),
             html.Br(),
             html.Div([
-                dbc.Table.from_dataframe(
-                    response, 
-                    striped=True, 
-                    bordered=True, 
-                    hover=True,
-                    size='sm',
-                    style={'marginTop': '10px'}
+                # Rows are rendered client-side, only the visible window at a time
+                dash_table.DataTable(
+                    data=content['data'],
+                    columns=[{'name': col, 'id': col} for col in content['columns']],
+                    virtualization=True,
+                    fixed_rows={'headers': True},
+                    page_size=20,
+                    style_table={'maxHeight': '400px', 'overflowY': 'auto', 'marginTop': '10px'}
                 )
             ])
-        ], style=custom_styles['bot_message'])
+        ], className='wf-bot-msg')
         
-    elif hasattr(response, 'savefig'):  # matplotlib figure
-        # Convert matplotlib figure to base64 image
-        img_buffer = io.BytesIO()
-        response.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.read()).decode()
-        plt.close(response)  # Close figure to free memory
+    elif kind == "figure":
+        return html.Div([
+            html.Strong("Assistant: "),
+            html.Br(),
+            dcc.Graph(figure=content, config={'displayModeBar': False})
+        ], className='wf-bot-msg')
         
+    elif kind == "image":
         return html.Div([
             html.Strong("Assistant: "),
             html.Br(),
             html.Img(
-                src=f"data:image/png;base64,{img_base64}",
+                src=f"data:image/png;base64,{content}",
                 style={'maxWidth': '100%', 'height': 'auto', 'marginTop': '10px'}
             )
-        ], style=custom_styles['bot_message'])
+        ], className='wf-bot-msg')
     
     else:
-        # Fallback for unknown response types
+        # Text response
         return html.Div([
             html.Strong("Assistant: "),
-            html.Span(str(response))
-        ], style=custom_styles['bot_message'])
+            html.Span(content)
+        ], className='wf-bot-msg')
 
 @app.callback(
     [Output("chat-container", "children"),
@@ -245,38 +282,42 @@ def format_response_for_display(response):
      Output("chat-history", "data")],
     [Input("submit-button", "n_clicks"),
      Input("user-input", "n_submit")],
-    [State("user-input", "value"),
-     State("chat-container", "children"),
-     State("chat-history", "data")]
+    [State("user-input", "value")]
 )
-def update_chat(n_clicks, n_submit, user_input, chat_children, chat_history):
-    """Update chat when user sends a message"""
+def update_chat(n_clicks, n_submit, user_input):
+    """Append the user message and bot response to the chat and its history"""
     
     # Check if callback was triggered
     ctx = callback_context
     if not ctx.triggered or not user_input or user_input.strip() == "":
-        return chat_children, "", chat_history
-    
-    # Add user message to chat
-    user_message_div = html.Div([
-        html.Strong("You: "),
-        user_input
-    ], style=custom_styles['user_message'])
+        return no_update, "", no_update
     
     # Get bot response using your function
     bot_response = get_chatbot_response(user_input)
-    bot_message_div = format_response_for_display(bot_response)
+    bot_record = response_to_record(bot_response)
+    
+    # One timestamp for the whole turn
+    now = datetime.now().isoformat()
+    user_record = {"type": "user", "content": user_input, "timestamp": now}
     
-    # Update chat history
-    new_history = chat_history + [
-        {"type": "user", "content": user_input, "timestamp": datetime.now().isoformat()},
-        {"type": "bot", "content": str(bot_response), "timestamp": datetime.now().isoformat()}
-    ]
+    # Patches append in place, so only the new turn goes over the wire
+    children_patch = Patch()
+    children_patch.append(render_record(user_record))
+    children_patch.append(render_record(bot_record))
+    
+    # History keeps text verbatim but only a summary of tables and charts, which are already rendered
+    if bot_record["kind"] == "text":
+        bot_entry = dict(bot_record, timestamp=now)
+    else:
+        bot_entry = {"type": "bot", "kind": bot_record["kind"], "content": None, "timestamp": now}
+        if bot_record["kind"] == "table":
+            bot_entry["rows"] = len(bot_record["content"]["data"])
     
-    # Add new messages to chat
-    updated_chat = chat_children + [user_message_div, bot_message_div]
+    history_patch = Patch()
+    history_patch.append(user_record)
+    history_patch.append(bot_entry)
     
-    return updated_chat, "", new_history
+    return children_patch, "", history_patch
 
 # Auto-scroll chat to bottom with JavaScript
 app.clientside_callback(
@@ -1,28 +1,113 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import gzip
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
+import ijson
+import numpy as np
 import pandas as pd
+from numba import njit
 import json
+import orjson
 import time
-from datetime import datetime, timedelta
 import os
-from typing import Dict, List, Optional
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
-import re
+from typing import Dict, List, Optional, Tuple
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# SEC fair-access policy: at most 10 requests per second per client
+SEC_MAX_REQUESTS_PER_SECOND = 10
+
+def _invert_gaap_mapping(mapping: Dict[str, List[str]]) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Invert target -> [tags] into tag -> [(target, priority)]; lower priority wins
+    
+    A tag can feed several targets (e.g. InterestAndDividendIncomeOperating).
+    """
+    tag_targets = {}
+    for target_metric, possible_tags in mapping.items():
+        for rank, tag in enumerate(possible_tags):
+            tag_targets.setdefault(tag, []).append((target_metric, rank))
+    return tag_targets
+
+
+def _date_int(iso_date: str) -> int:
+    """YYYY-MM-DD -> YYYYMMDD int, so date ranges compare as integers"""
+    return int(iso_date.replace('-', ''))
+
+
+# Form types kept by extraction; anything else encodes as 255
+_FORM_CODES = {'10-Q': 0, '10-K': 1}
+
+
+@njit(cache=True, fastmath=True)
+def _select_entries(ends: np.ndarray, forms: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    """
+    Indices of entries with lo <= end <= hi (YYYYMMDD ints) and a 10-Q/10-K form code
+    """
+    keep = np.empty(ends.shape[0], dtype=np.int64)
+    n = 0
+    for i in range(ends.shape[0]):
+        if lo <= ends[i] <= hi and forms[i] <= 1:
+            keep[n] = i
+            n += 1
+    return keep[:n]
+
+
+class _AsyncRateLimiter:
+    """Spaces request start times at least 1/rate seconds apart across all coroutines"""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
 class SECBankDataExtractor:
-    def __init__(self, user_agent: str = "YourCompany yourname@yourcompany.com"):
+    # Common GAAP tags mapping to our target metrics
+    GAAP_MAPPING = {
+        'TotalRevenue': ['Revenues', 'RevenueFromContractWithCustomerExcludingAssessedTax', 'InterestAndDividendIncomeOperating'],
+        'InterestIncome': ['InterestAndFeeIncomeLoansAndLeases', 'InterestIncomeOperating', 'InterestAndDividendIncomeOperating'],
+        'NonInterestIncome': ['NoninterestIncome', 'RevenuesExcludingInterestAndDividends'],
+        'InterestExpense': ['InterestExpense', 'InterestExpenseDeposits', 'InterestExpenseDebt'],
+        'NetInterestIncome': ['InterestIncomeExpenseNet', 'NetInterestIncome'],
+        'ProvisionForLoanLosses': ['ProvisionForLoanAndLeaseLosses', 'ProvisionForCreditLosses'],
+        'NonInterestExpense': ['NoninterestExpense', 'OperatingExpenses'],
+        'NetIncome': ['NetIncomeLoss', 'ProfitLoss', 'NetIncomeLossAvailableToCommonStockholdersBasic'],
+        'EarningsPerShare': ['EarningsPerShareBasic', 'EarningsPerShareDiluted'],
+        'TotalAssets': ['Assets', 'AssetsCurrent'],
+        'TotalLoans': ['LoansAndLeasesReceivableNetOfAllowance', 'LoansAndLeasesReceivableGross'],
+        'TotalDeposits': ['Deposits', 'DepositsTotal'],
+        'ShareholdersEquity': ['StockholdersEquity', 'StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest']
+    }
+    # Only these us-gaap subtrees are kept when parsing company facts
+    GAAP_TAGS = frozenset(tag for tags in GAAP_MAPPING.values() for tag in tags)
+    TAG_TARGETS = _invert_gaap_mapping(GAAP_MAPPING)
+    
+    def __init__(self, user_agent: str = "YourCompany yourname@yourcompany.com", cache_dir: str = "sec_cache"):
         """
         Initialize the SEC data extractor
         
         Args:
             user_agent: Required user agent for SEC API requests
+            cache_dir: Directory for gzipped company-facts responses and their validators
         """
         self.user_agent = user_agent
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
         self.base_url = "https://data.sec.gov"
         self.headers = {
             'User-Agent': self.user_agent,
@@ -30,6 +115,12 @@ class SECBankDataExtractor:
             'Host': 'data.sec.gov'
         }
         
+        # One keep-alive session for all sync calls, retrying throttled / unavailable responses
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 503])
+        self.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry))
+        
         # Top 20 US Banks by Assets (CIK numbers)
         self.top_banks = {
             'JPMorgan Chase & Co.': '0000019617',
@@ -74,9 +165,74 @@ class SECBankDataExtractor:
             'ReturnOnEquity'
         ]
     
+    def _facts_cache_paths(self, cik: str):
+        stem = os.path.join(self.cache_dir, f"CIK{cik.zfill(10)}")
+        return f"{stem}.json.gz", f"{stem}.validators.json"
+    
+    def _conditional_headers(self, cik: str) -> Dict[str, str]:
+        """
+        Request headers for company facts, conditional on the cached copy if there is one
+        
+        Args:
+            cik: Company CIK number
+            
+        Returns:
+            SEC headers plus If-None-Match / If-Modified-Since when a cached response exists
+        """
+        data_path, validators_path = self._facts_cache_paths(cik)
+        headers = dict(self.headers)
+        if os.path.exists(data_path) and os.path.exists(validators_path):
+            with open(validators_path) as f:
+                validators = json.load(f)
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+    
+    def _store_validators(self, cik: str, response_headers):
+        _, validators_path = self._facts_cache_paths(cik)
+        with open(validators_path, 'w') as f:
+            json.dump({
+                'etag': response_headers.get('ETag'),
+                'last_modified': response_headers.get('Last-Modified')
+            }, f)
+    
+    def _load_cached_facts(self, cik: str) -> Dict:
+        """
+        Stream-parse the cached company facts, keeping only entityName and the us-gaap tags we map
+        
+        The full XBRL tree is never materialized; subtrees of other tags are skipped event by event.
+        
+        Args:
+            cik: Company CIK number
+            
+        Returns:
+            Company facts dictionary restricted to GAAP_TAGS
+        """
+        data_path, _ = self._facts_cache_paths(cik)
+        us_gaap = {}
+        company_facts = {'facts': {'us-gaap': us_gaap}}
+        
+        builder = tag = tag_prefix = None
+        with gzip.open(data_path, 'rb') as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is not None:
+                    builder.event(event, value)
+                    if prefix == tag_prefix and event == 'end_map':
+                        us_gaap[tag] = builder.value
+                        builder = None
+                elif prefix == 'facts.us-gaap' and event == 'map_key' and value in self.GAAP_TAGS:
+                    tag, tag_prefix = value, f"facts.us-gaap.{value}"
+                    builder = ijson.ObjectBuilder()
+                elif prefix == 'entityName' and event == 'string':
+                    company_facts['entityName'] = value
+        
+        return company_facts
+    
     def get_company_facts(self, cik: str) -> Optional[Dict]:
         """
-        Get company facts from SEC API
+        Get company facts from SEC API, revalidating a local cached copy when available
         
         Args:
             cik: Company CIK number
@@ -86,18 +242,98 @@ class SECBankDataExtractor:
         """
         try:
             url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
-            response = requests.get(url, headers=self.headers)
+            data_path, _ = self._facts_cache_paths(cik)
+            with self.session.get(url, headers=self._conditional_headers(cik), stream=True) as response:
+                if response.status_code == 200:
+                    # Body goes straight to the cache in chunks, then is parsed from there
+                    with gzip.open(f"{data_path}.tmp", 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=1 << 16):
+                            f.write(chunk)
+                    os.replace(f"{data_path}.tmp", data_path)
+                    self._store_validators(cik, response.headers)
+                elif response.status_code != 304:
+                    logger.warning(f"Failed to get company facts for CIK {cik}: {response.status_code}")
+                    return None
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.warning(f"Failed to get company facts for CIK {cik}: {response.status_code}")
-                return None
+            # 304 means the cached copy is still current
+            return self._load_cached_facts(cik)
                 
         except Exception as e:
             logger.error(f"Error getting company facts for CIK {cik}: {str(e)}")
             return None
     
+    async def aget_company_facts(self, client: httpx.AsyncClient, limiter: _AsyncRateLimiter, cik: str) -> Optional[Dict]:
+        """
+        Async version of get_company_facts sharing one client and rate limiter across requests
+        
+        Args:
+            client: Open HTTP client with the SEC headers set
+            limiter: Rate limiter shared by all concurrent requests
+            cik: Company CIK number
+            
+        Returns:
+            Dictionary containing company facts or None if error
+        """
+        if not await self._arefresh_company_facts(client, limiter, cik):
+            return None
+        try:
+            return self._load_cached_facts(cik)
+        except Exception as e:
+            logger.error(f"Error getting company facts for CIK {cik}: {str(e)}")
+            return None
+    
+    async def _arefresh_company_facts(self, client: httpx.AsyncClient, limiter: _AsyncRateLimiter, cik: str) -> bool:
+        """
+        Bring the cached company facts for a CIK up to date without parsing them
+        
+        Args:
+            client: Open HTTP client with the SEC headers set
+            limiter: Rate limiter shared by all concurrent requests
+            cik: Company CIK number
+            
+        Returns:
+            True if the cache file is current, False if the request failed
+        """
+        try:
+            url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
+            await limiter.wait()
+            data_path, _ = self._facts_cache_paths(cik)
+            async with client.stream("GET", url, headers=self._conditional_headers(cik)) as response:
+                if response.status_code == 200:
+                    with gzip.open(f"{data_path}.tmp", 'wb') as f:
+                        async for chunk in response.aiter_bytes(chunk_size=1 << 16):
+                            f.write(chunk)
+                    os.replace(f"{data_path}.tmp", data_path)
+                    self._store_validators(cik, response.headers)
+                elif response.status_code != 304:
+                    logger.warning(f"Failed to get company facts for CIK {cik}: {response.status_code}")
+                    return False
+            
+            return True
+                
+        except Exception as e:
+            logger.error(f"Error getting company facts for CIK {cik}: {str(e)}")
+            return False
+    
+    async def _arefresh_all_company_facts(self) -> Dict[str, bool]:
+        """
+        Refresh the cached company facts for every bank concurrently, within the SEC rate limit
+        
+        Returns:
+            Dictionary mapping bank name to whether its cache file is current
+        """
+        limiter = _AsyncRateLimiter(SEC_MAX_REQUESTS_PER_SECOND)
+        semaphore = asyncio.Semaphore(SEC_MAX_REQUESTS_PER_SECOND)
+        
+        async with httpx.AsyncClient(headers=self.headers, timeout=60.0) as client:
+            async def fetch(cik: str) -> bool:
+                async with semaphore:
+                    return await self._arefresh_company_facts(client, limiter, cik)
+            
+            results = await asyncio.gather(*(fetch(cik) for cik in self.top_banks.values()))
+        
+        return dict(zip(self.top_banks.keys(), results))
+    
     def get_company_filings(self, cik: str, start_date: str, end_date: str) -> Optional[Dict]:
         """
         Get company filings from SEC API
@@ -112,20 +348,23 @@ class SECBankDataExtractor:
         """
         try:
             url = f"{self.base_url}/api/xbrl/submissions/CIK{cik.zfill(10)}.json"
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url)
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 # Filter filings by date and form type
                 filings = []
                 recent_filings = data.get('filings', {}).get('recent', {})
                 
                 if recent_filings:
+                    lo, hi = _date_int(start_date), _date_int(end_date)
                     for i in range(len(recent_filings.get('form', []))):
                         form_type = recent_filings['form'][i]
-                        filing_date = recent_filings['filingDate'][i]
+                        if form_type not in ('10-K', '10-Q'):
+                            continue
                         
-                        if form_type in ['10-K', '10-Q'] and start_date <= filing_date <= end_date:
+                        filing_date = recent_filings['filingDate'][i]
+                        if lo <= _date_int(filing_date) <= hi:
                             filings.append({
                                 'form': form_type,
                                 'filingDate': filing_date,
@@ -143,7 +382,7 @@ class SECBankDataExtractor:
             logger.error(f"Error getting filings for CIK {cik}: {str(e)}")
             return None
     
-    def extract_financial_metrics(self, company_facts: Dict, start_date: str, end_date: str) -> List[Dict]:
+    def extract_financial_metrics(self, company_facts: Dict, start_date: str, end_date: str) -> pd.DataFrame:
         """
         Extract financial metrics from company facts
         
@@ -153,71 +392,50 @@ class SECBankDataExtractor:
             end_date: End date in YYYY-MM-DD format
             
         Returns:
-            List of dictionaries containing extracted metrics
+            DataFrame with one row per period end (Datetime, CompanyName, target metrics)
         """
-        metrics_data = []
+        metrics_data = pd.DataFrame()
         
         try:
             facts = company_facts.get('facts', {})
             us_gaap = facts.get('us-gaap', {})
             dei = facts.get('dei', {})
             
-            # Common GAAP tags mapping to our target metrics
-            gaap_mapping = {
-                'TotalRevenue': ['Revenues', 'RevenueFromContractWithCustomerExcludingAssessedTax', 'InterestAndDividendIncomeOperating'],
-                'InterestIncome': ['InterestAndFeeIncomeLoansAndLeases', 'InterestIncomeOperating', 'InterestAndDividendIncomeOperating'],
-                'NonInterestIncome': ['NoninterestIncome', 'RevenuesExcludingInterestAndDividends'],
-                'InterestExpense': ['InterestExpense', 'InterestExpenseDeposits', 'InterestExpenseDebt'],
-                'NetInterestIncome': ['InterestIncomeExpenseNet', 'NetInterestIncome'],
-                'ProvisionForLoanLosses': ['ProvisionForLoanAndLeaseLosses', 'ProvisionForCreditLosses'],
-                'NonInterestExpense': ['NoninterestExpense', 'OperatingExpenses'],
-                'NetIncome': ['NetIncomeLoss', 'ProfitLoss', 'NetIncomeLossAvailableToCommonStockholdersBasic'],
-                'EarningsPerShare': ['EarningsPerShareBasic', 'EarningsPerShareDiluted'],
-                'TotalAssets': ['Assets', 'AssetsCurrent'],
-                'TotalLoans': ['LoansAndLeasesReceivableNetOfAllowance', 'LoansAndLeasesReceivableGross'],
-                'TotalDeposits': ['Deposits', 'DepositsTotal'],
-                'ShareholdersEquity': ['StockholdersEquity', 'StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest']
-            }
+            # Flatten the relevant entries to long form: one row per (entry, target it can feed)
+            rows = [
+                (target_metric, rank, entry['end'], entry.get('form'), entry['val'])
+                for tag, targets in self.TAG_TARGETS.items() if tag in us_gaap
+                for unit_entries in us_gaap[tag].get('units', {}).values()
+                for entry in unit_entries if 'val' in entry and 'end' in entry
+                for target_metric, rank in targets
+            ]
+            entries = pd.DataFrame(rows, columns=['target', 'rank', 'end', 'form', 'val'])
             
-            # Get all available periods
-            all_periods = set()
-            for metric_group in gaap_mapping.values():
-                for tag in metric_group:
-                    if tag in us_gaap:
-                        for unit_type in us_gaap[tag].get('units', {}):
-                            for entry in us_gaap[tag]['units'][unit_type]:
-                                if 'end' in entry and start_date <= entry['end'] <= end_date:
-                                    all_periods.add(entry['end'])
+            # Date range + form filter runs as a compiled loop over integer-encoded columns
+            ends = np.fromiter((_date_int(end) for end in entries['end']), dtype=np.int64, count=len(entries))
+            forms = np.fromiter((_FORM_CODES.get(form, 255) for form in entries['form']), dtype=np.uint8, count=len(entries))
+            keep = _select_entries(ends, forms, _date_int(start_date), _date_int(end_date))
+            entries = entries.iloc[keep]
             
-            # Extract data for each period
-            for period_end in sorted(all_periods):
-                period_data = {
-                    'Datetime': period_end,
-                    'CompanyName': company_facts.get('entityName', 'Unknown')
-                }
-                
-                # Extract each metric
-                for target_metric, possible_tags in gaap_mapping.items():
-                    value = None
-                    for tag in possible_tags:
-                        if tag in us_gaap:
-                            for unit_type in us_gaap[tag].get('units', {}):
-                                for entry in us_gaap[tag]['units'][unit_type]:
-                                    if entry.get('end') == period_end and 'val' in entry:
-                                        # Prefer quarterly data (form 10-Q) over annual
-                                        if entry.get('form') in ['10-Q', '10-K']:
-                                            value = entry['val']
-                                            break
-                                if value is not None:
-                                    break
-                        if value is not None:
-                            break
-                    
-                    period_data[target_metric] = value
-                
-                # Only add if we have some meaningful data
-                if any(period_data[metric] is not None for metric in self.target_metrics):
-                    metrics_data.append(period_data)
+            # First entry of the highest-priority tag wins; the stable sort keeps entry order within a tag
+            entries = (
+                entries
+                .sort_values('rank', kind='stable')
+                .drop_duplicates(['end', 'target'], keep='first')
+            )
+            wide = (
+                entries
+                .pivot(index='end', columns='target', values='val')
+                .reindex(columns=list(self.GAAP_MAPPING))
+                .sort_index()
+            )
+            wide.columns.name = None
+            
+            # Only keep periods with some meaningful data
+            wide = wide[wide.notna().any(axis=1)]
+            
+            metrics_data = wide.rename_axis('Datetime').reset_index()
+            metrics_data.insert(1, 'CompanyName', company_facts.get('entityName', 'Unknown'))
         
         except Exception as e:
             logger.error(f"Error extracting metrics: {str(e)}")
@@ -235,34 +453,40 @@ class SECBankDataExtractor:
         Returns:
             DataFrame containing all bank earnings data
         """
-        all_data = []
+        all_frames = []
         
         logger.info(f"Starting data download for {len(self.top_banks)} banks from {start_date} to {end_date}")
         
-        for i, (bank_name, cik) in enumerate(self.top_banks.items()):
-            logger.info(f"Processing {i+1}/{len(self.top_banks)}: {bank_name}")
+        # Network-bound: refresh every bank's cache file concurrently
+        refreshed = asyncio.run(self._arefresh_all_company_facts())
+        
+        # CPU-bound: parse and extract each bank in its own process; workers read the cache
+        # files themselves, so only paths and the resulting frames cross process boundaries
+        with ProcessPoolExecutor() as executor:
+            futures = {
+                bank_name: executor.submit(_extract_cached_bank, self.cache_dir, cik, start_date, end_date)
+                for bank_name, cik in self.top_banks.items() if refreshed.get(bank_name)
+            }
             
-            try:
-                # Get company facts
-                company_facts = self.get_company_facts(cik)
-                if company_facts:
-                    # Extract metrics
-                    bank_metrics = self.extract_financial_metrics(company_facts, start_date, end_date)
-                    all_data.extend(bank_metrics)
-                    
-                    logger.info(f"Extracted {len(bank_metrics)} records for {bank_name}")
-                else:
-                    logger.warning(f"No company facts found for {bank_name}")
+            for i, bank_name in enumerate(self.top_banks):
+                logger.info(f"Processing {i+1}/{len(self.top_banks)}: {bank_name}")
                 
-                # Rate limiting - SEC allows 10 requests per second
-                time.sleep(0.1)
+                if bank_name not in futures:
+                    logger.warning(f"No company facts found for {bank_name}")
+                    continue
                 
-            except Exception as e:
-                logger.error(f"Error processing {bank_name}: {str(e)}")
-                continue
+                try:
+                    bank_metrics = futures[bank_name].result()
+                    all_frames.append(bank_metrics)
+                    
+                    logger.info(f"Extracted {len(bank_metrics)} records for {bank_name}")
+                    
+                except Exception as e:
+                    logger.error(f"Error processing {bank_name}: {str(e)}")
+                    continue
         
         # Create DataFrame
-        df = pd.DataFrame(all_data)
+        df = pd.concat(all_frames, ignore_index=True) if all_frames else pd.DataFrame()
         
         if not df.empty:
             # Convert datetime column
@@ -289,25 +513,23 @@ class SECBankDataExtractor:
             filename: Output filename
         """
         try:
-            # Create Excel writer
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+            # xlsxwriter in its default mode; to_excel writes column by column, which
+            # constant_memory (row-at-a-time flushing) would silently truncate
+            with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
                 # Main data sheet
                 df.to_excel(writer, sheet_name='Bank_Earnings_Data', index=False)
                 
                 # Summary sheet
                 if not df.empty:
-                    summary_data = []
-                    for company in df['CompanyName'].unique():
-                        company_data = df[df['CompanyName'] == company]
-                        summary_data.append({
-                            'Company': company,
-                            'Records': len(company_data),
-                            'Date_Range': f"{company_data['Datetime'].min().strftime('%Y-%m-%d')} to {company_data['Datetime'].max().strftime('%Y-%m-%d')}",
-                            'Latest_Revenue': company_data['TotalRevenue'].dropna().iloc[-1] if not company_data['TotalRevenue'].dropna().empty else None,
-                            'Latest_Net_Income': company_data['NetIncome'].dropna().iloc[-1] if not company_data['NetIncome'].dropna().empty else None
-                        })
+                    # One grouped pass; last() skips NaN, so it picks the latest reported value
+                    g = df.groupby('CompanyName', sort=False, observed=True)
+                    summary_df = pd.DataFrame({
+                        'Records': g.size(),
+                        'Date_Range': g['Datetime'].min().dt.strftime('%Y-%m-%d') + ' to ' + g['Datetime'].max().dt.strftime('%Y-%m-%d'),
+                        'Latest_Revenue': g['TotalRevenue'].last(),
+                        'Latest_Net_Income': g['NetIncome'].last()
+                    }).rename_axis('Company').reset_index()
                     
-                    summary_df = pd.DataFrame(summary_data)
                     summary_df.to_excel(writer, sheet_name='Summary', index=False)
             
             logger.info(f"Data saved to {filename}")
@@ -315,6 +537,24 @@ class SECBankDataExtractor:
         except Exception as e:
             logger.error(f"Error saving to Excel: {str(e)}")
 
+
+def _extract_cached_bank(cache_dir: str, cik: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Process-pool worker: parse one bank's cached company facts and extract its metrics
+    
+    Args:
+        cache_dir: Cache directory the facts were downloaded to
+        cik: Company CIK number
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        
+    Returns:
+        DataFrame of extracted metrics for the bank
+    """
+    extractor = SECBankDataExtractor(cache_dir=cache_dir)
+    return extractor.extract_financial_metrics(extractor._load_cached_facts(cik), start_date, end_date)
+
+
 def main():
     """
     Main function to run the SEC bank data extraction
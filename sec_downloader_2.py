@@ -1,28 +1,239 @@
-import requests
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import httpx
+import ijson
+import io
+import numpy as np
 import pandas as pd
+from numba import njit
 import json
+import orjson
 import time
 from datetime import datetime, timedelta
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 from bs4 import BeautifulSoup
 import re
+import sys
 import logging
+import gaap_tags
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# SEC fair-access policy: at most 10 requests per second per client
+SEC_MAX_REQUESTS_PER_SECOND = 10
+
+# Top 20 US Banks by Assets (CIK numbers)
+TOP_BANKS = {
+    'JPMorgan Chase & Co.': '0000019617',
+    'Bank of America Corp': '0000070858',
+    'Wells Fargo & Company': '0000072971',
+    'Citigroup Inc.': '0000831001',
+    'U.S. Bancorp': '0000036104',
+    'PNC Financial Services Group Inc': '0000713676',
+    'Goldman Sachs Group Inc': '0000886982',
+    'Truist Financial Corporation': '0000092230',
+    'Capital One Financial Corp': '0000927628',
+    'Bank of New York Mellon Corp': '0001390777',
+    'Charles Schwab Corporation': '0000316709',
+    'TD Group US Holdings LLC': '0001843204',
+    'American Express Company': '0000004962',
+    'State Street Corporation': '0000093751',
+    'Citizens Financial Group Inc': '0001378946',
+    'Fifth Third Bancorp': '0000035527',
+    'KeyCorp': '0000091576',
+    'Regions Financial Corporation': '0000039899',
+    'Northern Trust Corporation': '0000073124',
+    'Huntington Bancshares Inc': '0000049196'
+}
+
+# (bank name, 10-digit CIK) pairs, padded once for URL building
+_TOP_BANKS_PADDED = tuple((name, cik.zfill(10)) for name, cik in TOP_BANKS.items())
+
+# Filing forms accepted as a metric source; within a tag the lower rank wins, anything else encodes as 255
+_FORM_RANK = {'10-Q': 0, '10-K': 1}
+
+# Company-facts bodies above this size are stream-parsed instead of loaded whole
+STREAM_PARSE_MIN_BYTES = 2 * 1024 * 1024
+
+# Request / cache failures (EOFError: truncated gzip body) and malformed response bodies
+_FETCH_ERRORS = (httpx.HTTPError, OSError, EOFError)
+_PARSE_ERRORS = (ValueError, KeyError, IndexError, TypeError, AttributeError, ijson.JSONError)
+
+
+class _AsyncRateLimiter:
+    """Spaces request start times at least 1/rate seconds apart across all coroutines"""
+    
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _date_int(iso_date: str) -> int:
+    """YYYY-MM-DD -> YYYYMMDD int, so date ranges compare as integers"""
+    return int(iso_date[:4] + iso_date[5:7] + iso_date[8:10])
+
+
+def _datetime64_from_ints(dates: List[int]) -> np.ndarray:
+    """YYYYMMDD ints -> datetime64[D] array"""
+    return np.array([f"{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}" for d in dates], dtype='datetime64[D]')
+
+
+@njit(cache=True)
+def _classify_entries(ends: np.ndarray, vals: np.ndarray, forms: np.ndarray,
+                      lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Best entry per period end for one (tag, unit) series
+    
+    Keeps entries with lo <= end <= hi (YYYYMMDD ints) and a 10-Q/10-K form code; per end the
+    lowest form rank wins, ties go to the earliest entry.
+    
+    Returns:
+        (period ends, values, form ranks), ordered by period end
+    """
+    keep = np.empty(ends.shape[0], dtype=np.int64)
+    n = 0
+    for i in range(ends.shape[0]):
+        if lo <= ends[i] <= hi and forms[i] <= 1:
+            keep[n] = i
+            n += 1
+    keep = keep[:n]
+    
+    # Stable sort on (end, form rank) puts each period's winner first in its run
+    order = keep[np.argsort(ends[keep] * 2 + forms[keep], kind='mergesort')]
+    out_ends = np.empty(n, dtype=np.int64)
+    out_vals = np.empty(n, dtype=np.float64)
+    out_forms = np.empty(n, dtype=np.uint8)
+    m = 0
+    for i in order:
+        if m == 0 or ends[i] != out_ends[m - 1]:
+            out_ends[m] = ends[i]
+            out_vals[m] = vals[i]
+            out_forms[m] = forms[i]
+            m += 1
+    return out_ends[:m], out_vals[:m], out_forms[:m]
+
+
+@njit(cache=True)
+def _reduce_best(period_idx: np.ndarray, metric_idx: np.ndarray, priority: np.ndarray, vals: np.ndarray,
+                 n_periods: int, n_metrics: int) -> np.ndarray:
+    """
+    Dense (metric, period) grid holding the best candidate value per cell
+    
+    Lowest priority wins, ties go to the earliest candidate; cells without one are NaN.
+    """
+    grid = np.full((n_metrics, n_periods), np.nan)
+    best = np.full((n_metrics, n_periods), 1 << 62, dtype=np.int64)
+    for i in range(period_idx.shape[0]):
+        m, p = metric_idx[i], period_idx[i]
+        if priority[i] < best[m, p]:
+            best[m, p] = priority[i]
+            grid[m, p] = vals[i]
+    return grid
+
+
+class FileCache:
+    """
+    Gzipped response bodies on disk, each with a JSON sidecar holding fetched_at / ETag / Last-Modified
+    """
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _paths(self, key: str):
+        stem = os.path.join(self.cache_dir, key)
+        return f"{stem}.json.gz", f"{stem}.meta.json"
+    
+    def meta(self, key: str) -> Optional[Dict]:
+        """Sidecar metadata for key, or None if nothing is cached"""
+        data_path, meta_path = self._paths(key)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except ValueError:
+            # corrupt sidecar: treat as nothing cached
+            return None
+        return meta if isinstance(meta, dict) else None
+    
+    def get(self, key: str, ttl: float) -> Optional[bytes]:
+        """Cached body if it was fetched (or revalidated) less than ttl seconds ago"""
+        meta = self.meta(key)
+        fetched_at = meta.get('fetched_at') if meta else None
+        if fetched_at is None or time.time() - fetched_at >= ttl:
+            return None
+        try:
+            return self.read(key)
+        except (OSError, EOFError):
+            # unreadable body: drop it so the next request is unconditional
+            self.discard(key)
+            return None
+    
+    def read(self, key: str) -> bytes:
+        data_path, _ = self._paths(key)
+        with gzip.open(data_path, 'rb') as f:
+            return f.read()
+    
+    def put(self, key: str, content: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        data_path, _ = self._paths(key)
+        with gzip.open(f"{data_path}.tmp", 'wb') as f:
+            f.write(content)
+        os.replace(f"{data_path}.tmp", data_path)
+        self._write_meta(key, {'fetched_at': time.time(), 'etag': etag, 'last_modified': last_modified})
+    
+    def touch(self, key: str):
+        """Mark the cached body as revalidated now (after a 304)"""
+        meta = self.meta(key) or {}
+        meta['fetched_at'] = time.time()
+        self._write_meta(key, meta)
+    
+    def discard(self, key: str):
+        """Remove the cached body and sidecar for key, if present"""
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def _write_meta(self, key: str, meta: Dict):
+        _, meta_path = self._paths(key)
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+
 class SECBankDataExtractor:
-    def __init__(self, user_agent: str = "YourCompany yourname@yourcompany.com"):
+    # GAAP tags mapping to our 50 target metrics, and its inverse tag -> ((target_metric, tag_priority), ...)
+    GAAP_MAPPING = gaap_tags.GAAP_MAPPING
+    TAG_TARGETS = gaap_tags.TAG_TARGETS
+    
+    def __init__(self, user_agent: str = "YourCompany yourname@yourcompany.com",
+                 cache_dir: str = "sec_cache", cache_ttl: float = 24 * 3600):
         """
         Initialize the SEC data extractor
         
         Args:
             user_agent: Required user agent for SEC API requests
+            cache_dir: Directory for cached SEC responses
+            cache_ttl: Seconds a cached response is used without asking the SEC again
         """
         self.user_agent = user_agent
+        self.cache = FileCache(cache_dir)
+        self.cache_ttl = cache_ttl
         self.base_url = "https://data.sec.gov"
         self.headers = {
             'User-Agent': self.user_agent,
@@ -30,29 +241,12 @@ class SECBankDataExtractor:
             'Host': 'data.sec.gov'
         }
         
+        # Shared HTTP/2 client for sync calls: one TLS connection, multiplexed requests
+        self.client = httpx.Client(http2=True, headers=self.headers, timeout=12.0,
+                                   limits=httpx.Limits(max_connections=SEC_MAX_REQUESTS_PER_SECOND))
+        
         # Top 20 US Banks by Assets (CIK numbers)
-        self.top_banks = {
-            'JPMorgan Chase & Co.': '0000019617',
-            'Bank of America Corp': '0000070858',
-            'Wells Fargo & Company': '0000072971',
-            'Citigroup Inc.': '0000831001',
-            'U.S. Bancorp': '0000036104',
-            'PNC Financial Services Group Inc': '0000713676',
-            'Goldman Sachs Group Inc': '0000886982',
-            'Truist Financial Corporation': '0000092230',
-            'Capital One Financial Corp': '0000927628',
-            'Bank of New York Mellon Corp': '0001390777',
-            'Charles Schwab Corporation': '0000316709',
-            'TD Group US Holdings LLC': '0001843204',
-            'American Express Company': '0000004962',
-            'State Street Corporation': '0000093751',
-            'Citizens Financial Group Inc': '0001378946',
-            'Fifth Third Bancorp': '0000035527',
-            'KeyCorp': '0000091576',
-            'Regions Financial Corporation': '0000039899',
-            'Northern Trust Corporation': '0000073124',
-            'Huntington Bancshares Inc': '0000049196'
-        }
+        self.top_banks = TOP_BANKS
         
         # Top 50 financial metrics prioritized by importance for banking stakeholders
         # Order: Most critical metrics first (profitability, capital, risk) -> operational -> growth -> regulatory
@@ -128,6 +322,115 @@ class SECBankDataExtractor:
             'IntangibleAssets'                     # Other intangibles
         ]
     
+    def close(self):
+        """Close the shared HTTP client"""
+        self.client.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _conditional_headers(self, key: str) -> Dict[str, str]:
+        """
+        SEC headers plus If-None-Match / If-Modified-Since for the cached copy of key, if any
+        """
+        headers = dict(self.headers)
+        meta = self.cache.meta(key)
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+    
+    def _cache_response(self, key: str, status_code: int, content: bytes, response_headers) -> Optional[bytes]:
+        """
+        Store a 200 body, or refresh the cached one on 304
+        
+        Returns:
+            Response body (fresh or cached), or None for any other status
+        """
+        if status_code == 304:
+            self.cache.touch(key)
+            return self.cache.read(key)
+        if status_code == 200:
+            self.cache.put(key, content, response_headers.get('ETag'), response_headers.get('Last-Modified'))
+            return content
+        return None
+    
+    def _fetch_cached(self, key: str, url: str) -> Optional[bytes]:
+        """
+        Body for url from the cache while fresh, otherwise revalidated against the SEC
+        
+        Args:
+            key: Cache key
+            url: SEC API URL
+            
+        Returns:
+            Response body bytes, or None if the request failed
+        """
+        cached = self.cache.get(key, self.cache_ttl)
+        if cached is not None:
+            return cached
+        response = self.client.get(url, headers=self._conditional_headers(key))
+        body = self._cache_response(key, response.status_code, response.content, response.headers)
+        if body is None:
+            logger.warning(f"Failed to get {url}: {response.status_code}")
+        return body
+    
+    async def _afetch_cached(self, client: httpx.AsyncClient, limiter: _AsyncRateLimiter, key: str, url: str) -> Optional[bytes]:
+        """
+        Async version of _fetch_cached; fresh cache hits skip the rate limiter
+        """
+        cached = self.cache.get(key, self.cache_ttl)
+        if cached is not None:
+            return cached
+        await limiter.wait()
+        response = await client.get(url, headers=self._conditional_headers(key))
+        body = self._cache_response(key, response.status_code, response.content, response.headers)
+        if body is None:
+            logger.warning(f"Failed to get {url}: {response.status_code}")
+        return body
+    
+    @classmethod
+    def _parse_company_facts(cls, body: bytes) -> Dict:
+        """
+        Decode a company-facts body; large ones are stream-parsed keeping only mapped us-gaap tags
+        
+        Args:
+            body: Raw JSON bytes
+            
+        Returns:
+            Company facts dictionary (us-gaap restricted to TAG_TARGETS when streamed)
+        """
+        if len(body) < STREAM_PARSE_MIN_BYTES:
+            return orjson.loads(body)
+        
+        # entityName sits near the top, so this pass stops early
+        entity_name = next(ijson.items(io.BytesIO(body), 'entityName'), 'Unknown')
+        # One tag object is materialized at a time; unmapped ones are dropped straight away
+        us_gaap = {
+            tag: tag_data
+            for tag, tag_data in ijson.kvitems(io.BytesIO(body), 'facts.us-gaap', use_float=True)
+            if tag in cls.TAG_TARGETS
+        }
+        return {'entityName': entity_name, 'facts': {'us-gaap': us_gaap}}
+    
+    @classmethod
+    def _parse_company_facts_or_none(cls, body: Optional[bytes], cik: str) -> Optional[Dict]:
+        """
+        _parse_company_facts, logging and returning None for a missing or malformed body
+        """
+        if body is None:
+            return None
+        try:
+            return cls._parse_company_facts(body)
+        except _PARSE_ERRORS as e:
+            logger.error(f"Error parsing company facts for CIK {cik}: {str(e)}")
+            return None
+    
     def get_company_facts(self, cik: str) -> Optional[Dict]:
         """
         Get company facts from SEC API
@@ -138,19 +441,60 @@ class SECBankDataExtractor:
         Returns:
             Dictionary containing company facts or None if error
         """
+        url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
         try:
-            url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
-            response = requests.get(url, headers=self.headers)
+            body = self._fetch_cached(f"cf_{cik}", url)
+        except _FETCH_ERRORS as e:
+            logger.error(f"Error getting company facts for CIK {cik}: {str(e)}")
+            return None
+        
+        return self._parse_company_facts_or_none(body, cik)
+    
+    async def aget_company_facts(self, client: httpx.AsyncClient, limiter: _AsyncRateLimiter, cik: str) -> Optional[Dict]:
+        """
+        Async version of get_company_facts sharing one client and rate limiter across requests
+        
+        Args:
+            client: Open HTTP client with the SEC headers set
+            limiter: Rate limiter shared by all concurrent requests
+            cik: Company CIK number
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.warning(f"Failed to get company facts for CIK {cik}: {response.status_code}")
-                return None
-                
-        except Exception as e:
+        Returns:
+            Dictionary containing company facts or None if error
+        """
+        url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
+        try:
+            body = await self._afetch_cached(client, limiter, f"cf_{cik}", url)
+        except _FETCH_ERRORS as e:
             logger.error(f"Error getting company facts for CIK {cik}: {str(e)}")
             return None
+        
+        return self._parse_company_facts_or_none(body, cik)
+    
+    async def _afetch_all_company_facts(self) -> Dict[str, Optional[bytes]]:
+        """
+        Fetch raw company-facts bodies for every bank concurrently, within the SEC rate limit
+        
+        Returns:
+            Dictionary mapping bank name to its JSON body (None if the request failed)
+        """
+        limiter = _AsyncRateLimiter(SEC_MAX_REQUESTS_PER_SECOND)
+        semaphore = asyncio.Semaphore(SEC_MAX_REQUESTS_PER_SECOND)
+        limits = httpx.Limits(max_connections=SEC_MAX_REQUESTS_PER_SECOND)
+        
+        async with httpx.AsyncClient(headers=self.headers, http2=True, timeout=12.0, limits=limits) as client:
+            async def fetch(padded_cik: str) -> Optional[bytes]:
+                url = f"{self.base_url}/api/xbrl/companyfacts/CIK{padded_cik}.json"
+                async with semaphore:
+                    try:
+                        return await self._afetch_cached(client, limiter, f"cf_{padded_cik}", url)
+                    except _FETCH_ERRORS as e:
+                        logger.error(f"Error getting company facts for CIK {padded_cik}: {str(e)}")
+                        return None
+            
+            results = await asyncio.gather(*(fetch(padded_cik) for _, padded_cik in _TOP_BANKS_PADDED))
+        
+        return dict(zip((name for name, _ in _TOP_BANKS_PADDED), results))
     
     def get_company_filings(self, cik: str, start_date: str, end_date: str) -> Optional[Dict]:
         """
@@ -164,40 +508,46 @@ class SECBankDataExtractor:
         Returns:
             Dictionary containing filings data or None if error
         """
+        url = f"{self.base_url}/api/xbrl/submissions/CIK{cik.zfill(10)}.json"
         try:
-            url = f"{self.base_url}/api/xbrl/submissions/CIK{cik.zfill(10)}.json"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Filter filings by date and form type
-                filings = []
-                recent_filings = data.get('filings', {}).get('recent', {})
-                
-                if recent_filings:
-                    for i in range(len(recent_filings.get('form', []))):
-                        form_type = recent_filings['form'][i]
-                        filing_date = recent_filings['filingDate'][i]
-                        
-                        if form_type in ['10-K', '10-Q'] and start_date <= filing_date <= end_date:
-                            filings.append({
-                                'form': form_type,
-                                'filingDate': filing_date,
-                                'accessionNumber': recent_filings['accessionNumber'][i],
-                                'reportDate': recent_filings.get('reportDate', [''])[i],
-                                'primaryDocument': recent_filings.get('primaryDocument', [''])[i]
-                            })
-                
-                return {'filings': filings}
-            else:
-                logger.warning(f"Failed to get filings for CIK {cik}: {response.status_code}")
-                return None
-                
-        except Exception as e:
+            body = self._fetch_cached(f"sub_{cik}", url)
+        except _FETCH_ERRORS as e:
             logger.error(f"Error getting filings for CIK {cik}: {str(e)}")
             return None
+        
+        if body is None:
+            logger.warning(f"Failed to get filings for CIK {cik}")
+            return None
+        
+        try:
+            data = orjson.loads(body)
+            # Filter filings by date and form type
+            filings = []
+            recent_filings = data.get('filings', {}).get('recent', {})
+            
+            if recent_filings:
+                lo, hi = _date_int(start_date), _date_int(end_date)
+                for i in range(len(recent_filings.get('form', []))):
+                    form_type = recent_filings['form'][i]
+                    filing_date = recent_filings['filingDate'][i]
+                
+                    if form_type in ['10-K', '10-Q'] and lo <= _date_int(filing_date) <= hi:
+                        filings.append({
+                            'form': form_type,
+                            'filingDate': filing_date,
+                            'accessionNumber': recent_filings['accessionNumber'][i],
+                            'reportDate': recent_filings.get('reportDate', [''])[i],
+                            'primaryDocument': recent_filings.get('primaryDocument', [''])[i]
+                        })
+        except _PARSE_ERRORS as e:
+            logger.error(f"Error parsing filings for CIK {cik}: {str(e)}")
+            return None
+        
+        return {'filings': filings}
     
-    def extract_financial_metrics(self, company_facts: Dict, start_date: str, end_date: str) -> List[Dict]:
+    @classmethod
+    def extract_financial_metrics(cls, company_facts: Dict, start_date: str,
+                                  end_date: str) -> pd.DataFrame:
         """
         Extract financial metrics from company facts
         
@@ -207,134 +557,61 @@ class SECBankDataExtractor:
             end_date: End date in YYYY-MM-DD format
             
         Returns:
-            List of dictionaries containing extracted metrics
+            DataFrame with one row per period end (Datetime, CompanyName, target metrics), sorted by period
         """
-        metrics_data = []
+        company_name = company_facts.get('entityName', 'Unknown')
+        facts = company_facts.get('facts', {})
+        us_gaap = facts.get('us-gaap', {})
+        dei = facts.get('dei', {})
+        lo, hi = _date_int(start_date), _date_int(end_date)
         
-        try:
-            facts = company_facts.get('facts', {})
-            us_gaap = facts.get('us-gaap', {})
-            dei = facts.get('dei', {})
-            
-            # Comprehensive GAAP tags mapping to our 50 target metrics
-            gaap_mapping = {
-                # TIER 1: Core Profitability & Performance
-                'NetIncome': ['NetIncomeLoss', 'ProfitLoss', 'NetIncomeLossAvailableToCommonStockholdersBasic', 'IncomeLossFromContinuingOperations'],
-                'TotalRevenue': ['Revenues', 'RevenueFromContractWithCustomerExcludingAssessedTax', 'InterestAndDividendIncomeOperating', 'TotalRevenues'],
-                'NetInterestIncome': ['InterestIncomeExpenseNet', 'NetInterestIncome', 'InterestIncomeExpenseAfterProvisionForLoanLoss'],
-                'ReturnOnEquity': ['ReturnOnAverageEquity', 'ReturnOnEquity'],
-                'ReturnOnAssets': ['ReturnOnAverageAssets', 'ReturnOnAssets'],
-                'EarningsPerShare': ['EarningsPerShareBasic', 'IncomeLossFromContinuingOperationsPerBasicShare'],
-                'EarningsPerShareDiluted': ['EarningsPerShareDiluted', 'IncomeLossFromContinuingOperationsPerDilutedShare'],
-                
-                # TIER 2: Capital & Balance Sheet Strength
-                'TotalAssets': ['Assets', 'AssetsCurrent', 'AssetsNoncurrent'],
-                'ShareholdersEquity': ['StockholdersEquity', 'StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest', 'EquityAttributableToParent'],
-                'TotalDeposits': ['Deposits', 'DepositsTotal', 'InterestBearingDeposits', 'NoninterestBearingDeposits'],
-                'TotalLoans': ['LoansAndLeasesReceivableNetOfAllowance', 'LoansAndLeasesReceivableGross', 'LoansReceivableNet'],
-                'BookValuePerShare': ['BookValuePerShare', 'StockholdersEquityPerShare'],
-                'TangibleBookValuePerShare': ['TangibleBookValuePerShare'],
-                'Tier1CapitalRatio': ['Tier1CapitalRatio', 'CapitalAdequacyTier1CapitalRatio'],
-                
-                # TIER 3: Risk Management & Credit Quality
-                'ProvisionForLoanLosses': ['ProvisionForLoanAndLeaseLosses', 'ProvisionForCreditLosses', 'ProvisionForDoubtfulAccounts'],
-                'AllowanceForLoanLosses': ['AllowanceForLoanAndLeaseLosses', 'AllowanceForCreditLossesFinancingReceivables'],
-                'NonPerformingLoans': ['LoansAndLeasesReceivableNonaccrual', 'NonperformingLoans'],
-                'ChargeOffs': ['LoansAndLeasesReceivableChargeOffs', 'ChargeOffsLoansAndLeases'],
-                'LoanLossReserveRatio': ['LoanLossReserveRatio'],
-                'NonPerformingAssetRatio': ['NonperformingAssetRatio'],
-                
-                # TIER 4: Income Statement Detail
-                'InterestIncome': ['InterestAndFeeIncomeLoansAndLeases', 'InterestIncomeOperating', 'InterestAndDividendIncomeOperating', 'InterestIncomeLoansAndLeases'],
-                'InterestExpense': ['InterestExpense', 'InterestExpenseDeposits', 'InterestExpenseDebt', 'InterestExpenseBorrowings'],
-                'NonInterestIncome': ['NoninterestIncome', 'RevenuesExcludingInterestAndDividends', 'FeesAndCommissions'],
-                'NonInterestExpense': ['NoninterestExpense', 'OperatingExpenses', 'GeneralAndAdministrativeExpense'],
-                'OperatingExpenses': ['OperatingExpenses', 'CostsAndExpenses', 'OperatingCostsAndExpenses'],
-                'PersonnelExpense': ['LaborAndRelatedExpense', 'EmployeeRelatedExpense', 'SalariesAndWages'],
-                'OccupancyExpense': ['OccupancyNet', 'OccupancyAndEquipmentExpense'],
-                
-                # TIER 5: Operational Efficiency
-                'EfficiencyRatio': ['EfficiencyRatio'],
-                'NetInterestMargin': ['NetInterestMargin'],
-                'CostOfFunds': ['CostOfFunds'],
-                'AssetTurnover': ['AssetTurnover'],
-                'OperatingLeverage': ['OperatingLeverage'],
-                
-                # TIER 6: Growth & Market Metrics
-                'TotalRevenueGrowth': ['RevenueGrowthRate'],
-                'LoanGrowth': ['LoanGrowthRate'],
-                'DepositGrowth': ['DepositGrowthRate'],
-                'TangibleEquityRatio': ['TangibleEquityRatio'],
-                'LeverageRatio': ['LeverageRatio', 'DebtToEquityRatio'],
-                
-                # TIER 7: Trading & Investment Banking
-                'TradingRevenue': ['TradingGainsLosses', 'TradingAccountProfitLoss', 'SecuritiesGainLoss'],
-                'InvestmentBankingRevenue': ['InvestmentBankingRevenue', 'UnderwritingIncome'],
-                'TrustAndInvestmentFees': ['TrustFeesRevenue', 'InvestmentManagementAndTrustFees'],
-                'ServiceCharges': ['ServiceChargesOnDepositAccounts', 'ServiceCharges'],
-                'CardRevenue': ['CreditCardIncome', 'CreditCardFees'],
-                
-                # TIER 8: Regulatory & Capital Management
-                'CommonEquityTier1Ratio': ['CommonEquityTier1CapitalRatio', 'Tier1CommonCapitalRatio'],
-                'TotalCapitalRatio': ['TotalCapitalRatio', 'CapitalAdequacyTotalCapitalRatio'],
-                'RiskWeightedAssets': ['RiskWeightedAssets'],
-                'LeverageCapitalRatio': ['LeverageRatio', 'CapitalAdequacyLeverageRatio'],
-                'LiquidityRatio': ['LiquidityRatio', 'LiquidityCoverageRatio'],
-                
-                # TIER 9: Additional Balance Sheet Items
-                'TradingAssets': ['TradingSecuritiesDebt', 'TradingSecuritiesEquity', 'TradingSecurities'],
-                'AvailableForSaleSecurities': ['AvailableForSaleSecuritiesDebtSecurities', 'MarketableSecuritiesAvailableForSale'],
-                'HeldToMaturitySecurities': ['HeldToMaturitySecurities', 'DebtSecuritiesHeldToMaturity'],
-                'Goodwill': ['Goodwill'],
-                'IntangibleAssets': ['IntangibleAssetsNetExcludingGoodwill', 'FiniteLivedIntangibleAssetsNet']
-            }
-            
-            # Get all available periods
-            all_periods = set()
-            for metric_group in gaap_mapping.values():
-                for tag in metric_group:
-                    if tag in us_gaap:
-                        for unit_type in us_gaap[tag].get('units', {}):
-                            for entry in us_gaap[tag]['units'][unit_type]:
-                                if 'end' in entry and start_date <= entry['end'] <= end_date:
-                                    all_periods.add(entry['end'])
-            
-            # Extract data for each period
-            for period_end in sorted(all_periods):
-                period_data = {
-                    'Datetime': period_end,
-                    'CompanyName': company_facts.get('entityName', 'Unknown')
-                }
-                
-                # Extract each metric
-                for target_metric, possible_tags in gaap_mapping.items():
-                    value = None
-                    for tag in possible_tags:
-                        if tag in us_gaap:
-                            for unit_type in us_gaap[tag].get('units', {}):
-                                for entry in us_gaap[tag]['units'][unit_type]:
-                                    if entry.get('end') == period_end and 'val' in entry:
-                                        # Prefer quarterly data (form 10-Q) over annual, and recent over old
-                                        if entry.get('form') in ['10-Q', '10-K']:
-                                            if value is None or entry.get('form') == '10-Q':
-                                                value = entry['val']
-                                            break
-                                if value is not None:
-                                    break
-                        if value is not None:
-                            break
-                    
-                    period_data[target_metric] = value
+        # One pass over the company's tags, classifying each with a dict lookup. Every per-tag
+        # winner becomes a candidate for each metric the tag feeds, with priority
+        # tag rank * 2 + form rank: earlier tags win; within a tag 10-Q beats 10-K
+        metric_ids = {target_metric: i for i, target_metric in enumerate(cls.GAAP_MAPPING)}
+        ends_parts, vals_parts = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.float64)]
+        metric_parts, priority_parts = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for tag, tag_data in us_gaap.items():
+            targets = cls.TAG_TARGETS.get(tag)
+            if targets is None:
+                continue
+            for unit_entries in tag_data.get('units', {}).values():
+                # Cheap Python pass to typed arrays; the per-entry filtering runs compiled
+                entries = [entry for entry in unit_entries if entry.get('end') and 'val' in entry]
+                if not entries:
+                    continue
+                ends = np.fromiter((_date_int(entry['end']) for entry in entries), dtype=np.int64, count=len(entries))
+                vals = np.fromiter((entry['val'] for entry in entries), dtype=np.float64, count=len(entries))
+                forms = np.fromiter((_FORM_RANK.get(entry.get('form'), 255) for entry in entries), dtype=np.uint8, count=len(entries))
+                period_keys, best_vals, form_ranks = _classify_entries(ends, vals, forms, lo, hi)
                 
-                # Only add if we have some meaningful data (at least core metrics)
-                core_metrics = ['NetIncome', 'TotalRevenue', 'TotalAssets', 'ShareholdersEquity']
-                if any(period_data.get(metric) is not None for metric in core_metrics):
-                    metrics_data.append(period_data)
+                for target_metric, tag_rank in targets:
+                    ends_parts.append(period_keys)
+                    vals_parts.append(best_vals)
+                    metric_parts.append(np.full(len(period_keys), metric_ids[target_metric], dtype=np.int64))
+                    priority_parts.append(tag_rank * 2 + form_ranks.astype(np.int64))
         
-        except Exception as e:
-            logger.error(f"Error extracting metrics: {str(e)}")
+        # Compiled reduction of all candidates into a dense metric x period grid
+        all_ends = np.concatenate(ends_parts)
+        period_ends = np.unique(all_ends)
+        grid = _reduce_best(np.searchsorted(period_ends, all_ends), np.concatenate(metric_parts),
+                            np.concatenate(priority_parts), np.concatenate(vals_parts),
+                            len(period_ends), len(metric_ids))
         
-        return metrics_data
+        # Keep periods with some meaningful data (at least core metrics)
+        core_ids = [metric_ids[metric] for metric in ('NetIncome', 'TotalRevenue', 'TotalAssets', 'ShareholdersEquity')]
+        keep = ~np.isnan(grid[core_ids]).all(axis=0)
+        period_ends, grid = period_ends[keep], grid[:, keep]
+        
+        # Each grid row is one metric's contiguous column
+        columns = dict(zip(cls.GAAP_MAPPING, grid))
+        
+        # Built from typed arrays with the final column order, so banks concat without re-alignment
+        return pd.DataFrame({
+            'Datetime': _datetime64_from_ints(period_ends.tolist()),
+            'CompanyName': np.full(len(period_ends), company_name, dtype=object),
+            **columns
+        }, copy=False)
     
     def calculate_derived_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -347,24 +624,40 @@ class SECBankDataExtractor:
             DataFrame with additional calculated metrics
         """
         try:
-            # Calculate ROE if not available (Net Income / Shareholders Equity)
-            mask = (df['ReturnOnEquity'].isna()) & (df['NetIncome'].notna()) & (df['ShareholdersEquity'].notna()) & (df['ShareholdersEquity'] != 0)
-            df.loc[mask, 'ReturnOnEquity'] = (df.loc[mask, 'NetIncome'] / df.loc[mask, 'ShareholdersEquity']) * 100
-            
-            # Calculate ROA if not available (Net Income / Total Assets)
-            mask = (df['ReturnOnAssets'].isna()) & (df['NetIncome'].notna()) & (df['TotalAssets'].notna()) & (df['TotalAssets'] != 0)
-            df.loc[mask, 'ReturnOnAssets'] = (df.loc[mask, 'NetIncome'] / df.loc[mask, 'TotalAssets']) * 100
-            
-            # Calculate Book Value Per Share if not available
-            mask = (df['BookValuePerShare'].isna()) & (df['ShareholdersEquity'].notna())
-            # Note: Would need shares outstanding data which may not be readily available
-            
-            # Calculate Efficiency Ratio if not available (Non-Interest Expense / (Net Interest Income + Non-Interest Income))
-            mask = (df['EfficiencyRatio'].isna()) & (df['NonInterestExpense'].notna()) & \
-                   ((df['NetInterestIncome'].notna()) | (df['NonInterestIncome'].notna()))
-            
-            revenue_base = df['NetInterestIncome'].fillna(0) + df['NonInterestIncome'].fillna(0)
-            df.loc[mask & (revenue_base != 0), 'EfficiencyRatio'] = (df.loc[mask & (revenue_base != 0), 'NonInterestExpense'] / revenue_base.loc[mask & (revenue_base != 0)]) * 100
+            def col(name: str) -> np.ndarray:
+                return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            
+            net_income = col('NetIncome')
+            equity = col('ShareholdersEquity')
+            assets = col('TotalAssets')
+            
+            # Whole-column np.where fills; 0/0 and x/0 land only in rows the conditions reject
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Calculate ROE if not available (Net Income / Shareholders Equity)
+                roe = col('ReturnOnEquity')
+                df['ReturnOnEquity'] = np.where(
+                    np.isnan(roe) & ~np.isnan(net_income) & ~np.isnan(equity) & (equity != 0),
+                    net_income / equity * 100, roe)
+                
+                # Calculate ROA if not available (Net Income / Total Assets)
+                roa = col('ReturnOnAssets')
+                df['ReturnOnAssets'] = np.where(
+                    np.isnan(roa) & ~np.isnan(net_income) & ~np.isnan(assets) & (assets != 0),
+                    net_income / assets * 100, roa)
+                
+                # Calculate Book Value Per Share if not available
+                # Note: Would need shares outstanding data which may not be readily available
+                
+                # Calculate Efficiency Ratio if not available (Non-Interest Expense / (Net Interest Income + Non-Interest Income))
+                efficiency = col('EfficiencyRatio')
+                non_interest_expense = col('NonInterestExpense')
+                net_interest_income = col('NetInterestIncome')
+                non_interest_income = col('NonInterestIncome')
+                revenue_base = np.nan_to_num(net_interest_income) + np.nan_to_num(non_interest_income)
+                df['EfficiencyRatio'] = np.where(
+                    np.isnan(efficiency) & ~np.isnan(non_interest_expense)
+                    & (~np.isnan(net_interest_income) | ~np.isnan(non_interest_income)) & (revenue_base != 0),
+                    non_interest_expense / revenue_base * 100, efficiency)
             
             # Calculate Net Interest Margin if not available
             # This would require average earning assets data which may not be available
@@ -387,57 +680,61 @@ class SECBankDataExtractor:
         Returns:
             DataFrame containing all bank earnings data
         """
-        all_data = []
+        # Per-bank frames, concatenated once at the end
+        frames = []
         
         logger.info(f"Starting data download for {len(self.top_banks)} banks from {start_date} to {end_date}")
         logger.info(f"Extracting {len(self.target_metrics)} financial metrics")
         
-        for i, (bank_name, cik) in enumerate(self.top_banks.items()):
-            logger.info(f"Processing {i+1}/{len(self.top_banks)}: {bank_name}")
+        # Network-bound: fetch every bank's raw body concurrently
+        bodies = asyncio.run(self._afetch_all_company_facts())
+        
+        # CPU-bound: JSON parsing and extraction run in worker processes, one bank per task
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                bank_name: executor.submit(_extract_bank, body, start_date, end_date)
+                for bank_name, body in bodies.items() if body
+            }
             
-            try:
-                # Get company facts
-                company_facts = self.get_company_facts(cik)
-                if company_facts:
-                    # Extract metrics
-                    bank_metrics = self.extract_financial_metrics(company_facts, start_date, end_date)
-                    all_data.extend(bank_metrics)
-                    
-                    logger.info(f"Extracted {len(bank_metrics)} records for {bank_name}")
-                else:
-                    logger.warning(f"No company facts found for {bank_name}")
+            for i, bank_name in enumerate(self.top_banks):
+                logger.info(f"Processing {i+1}/{len(self.top_banks)}: {bank_name}")
                 
-                # Rate limiting - SEC allows 10 requests per second
-                time.sleep(0.1)
+                if bank_name not in futures:
+                    logger.warning(f"No company facts found for {bank_name}")
+                    continue
                 
-            except Exception as e:
-                logger.error(f"Error processing {bank_name}: {str(e)}")
-                continue
+                try:
+                    bank_df = futures[bank_name].result()
+                    if not bank_df.empty:
+                        frames.append(bank_df)
+                    
+                    logger.info(f"Extracted {len(bank_df)} records for {bank_name}")
+                    
+                except Exception:
+                    logger.exception(f"Error processing {bank_name}")
+                    continue
         
-        # Create DataFrame
-        df = pd.DataFrame(all_data)
+        # Every bank frame shares the column order Datetime, CompanyName, then metrics in priority order
+        df = pd.DataFrame()
+        if frames:
+            df = pd.concat(frames, ignore_index=True, copy=False)
         
         if not df.empty:
-            # Convert datetime column
-            df['Datetime'] = pd.to_datetime(df['Datetime'])
-            
-            # Ensure all target metrics are present as columns (even if empty)
-            for metric in self.target_metrics:
-                if metric not in df.columns:
-                    df[metric] = None
-            
-            # Reorder columns: Datetime, CompanyName, then metrics in priority order
-            column_order = ['Datetime', 'CompanyName'] + self.target_metrics
-            df = df.reindex(columns=column_order)
-            
             # Calculate derived metrics
             df = self.calculate_derived_metrics(df)
             
-            # Sort by company and date
-            df = df.sort_values(['CompanyName', 'Datetime'])
+            # Compact dtypes: CompanyName as category codes; a metric drops to float32 only when
+            # every value round-trips exactly (to_numeric's downcast would turn 3.57 into 3.5699999)
+            df['CompanyName'] = df['CompanyName'].astype('category')
+            for metric in self.target_metrics:
+                as_float32 = df[metric].to_numpy(dtype=np.float32)
+                if np.array_equal(as_float32.astype(np.float64), df[metric].to_numpy(dtype=np.float64), equal_nan=True):
+                    df[metric] = as_float32
             
-            # Reset index
-            df = df.reset_index(drop=True)
+            # Sort by company and date; only the two key columns are sorted (CompanyName on its
+            # category codes), then the rows are gathered once
+            row_order = df[['CompanyName', 'Datetime']].sort_values(['CompanyName', 'Datetime']).index
+            df = df.take(row_order).reset_index(drop=True)
             
             logger.info(f"Successfully extracted {len(df)} total records with {len(self.target_metrics)} metrics")
         else:
@@ -454,30 +751,34 @@ class SECBankDataExtractor:
             filename: Output filename
         """
         try:
-            # Create Excel writer
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+            # xlsxwriter in its default mode; to_excel writes column by column, which
+            # constant_memory (row-at-a-time flushing) would silently truncate
+            with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
                 # Main data sheet
                 df.to_excel(writer, sheet_name='Bank_Earnings_Data', index=False)
                 
                 # Summary sheet
                 if not df.empty:
-                    summary_data = []
-                    for company in df['CompanyName'].unique():
-                        company_data = df[df['CompanyName'] == company]
-                        latest_data = company_data.iloc[-1] if len(company_data) > 0 else None
-                        
-                        summary_data.append({
-                            'Company': company,
-                            'Records': len(company_data),
-                            'Date_Range': f"{company_data['Datetime'].min().strftime('%Y-%m-%d')} to {company_data['Datetime'].max().strftime('%Y-%m-%d')}",
-                            'Latest_Total_Assets': latest_data['TotalAssets'] if latest_data is not None else None,
-                            'Latest_Net_Income': latest_data['NetIncome'] if latest_data is not None else None,
-                            'Latest_ROE': latest_data['ReturnOnEquity'] if latest_data is not None else None,
-                            'Latest_ROA': latest_data['ReturnOnAssets'] if latest_data is not None else None,
-                            'Data_Quality_Score': f"{(company_data[self.target_metrics].notna().sum().sum() / (len(company_data) * len(self.target_metrics)) * 100):.1f}%"
-                        })
+                    # Per-company aggregates computed in one grouped pass each
+                    g = df.groupby('CompanyName', sort=False, observed=True)
+                    sizes = g.size()
+                    first_dates = g['Datetime'].min()
+                    last_dates = g['Datetime'].max()
+                    nna_total = g[self.target_metrics].count().sum(axis=1)
+                    latest = g.tail(1).set_index('CompanyName').reindex(sizes.index)
                     
-                    summary_df = pd.DataFrame(summary_data)
+                    # Assembled column-wise from the grouped series, no per-company loop
+                    quality = nna_total / (sizes * len(self.target_metrics)) * 100
+                    summary_df = pd.DataFrame({
+                        'Company': sizes.index.astype(str),
+                        'Records': sizes.to_numpy(),
+                        'Date_Range': (first_dates.dt.strftime('%Y-%m-%d') + ' to ' + last_dates.dt.strftime('%Y-%m-%d')).to_numpy(),
+                        'Latest_Total_Assets': latest['TotalAssets'].to_numpy(),
+                        'Latest_Net_Income': latest['NetIncome'].to_numpy(),
+                        'Latest_ROE': latest['ReturnOnEquity'].to_numpy(),
+                        'Latest_ROA': latest['ReturnOnAssets'].to_numpy(),
+                        'Data_Quality_Score': quality.map('{:.1f}%'.format).to_numpy()
+                    })
                     summary_df.to_excel(writer, sheet_name='Summary', index=False)
                 
                 # Metrics Dictionary sheet
@@ -528,6 +829,38 @@ class SECBankDataExtractor:
             
         except Exception as e:
             logger.error(f"Error saving to Excel: {str(e)}")
+    
+    def save_to_parquet(self, df: pd.DataFrame, filename: str = "bank_earnings_data.parquet"):
+        """
+        Save DataFrame to a zstd-compressed Parquet file
+        
+        Args:
+            df: DataFrame to save
+            filename: Output filename
+        """
+        try:
+            df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
+            logger.info(f"Data saved to {filename}")
+            
+        except Exception as e:
+            logger.error(f"Error saving to Parquet: {str(e)}")
+
+
+def _extract_bank(body: bytes, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Process-pool worker: parse one bank's company-facts body and extract its metrics
+    
+    Args:
+        body: Raw company-facts JSON
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+        
+    Returns:
+        Same as SECBankDataExtractor.extract_financial_metrics
+    """
+    company_facts = SECBankDataExtractor._parse_company_facts(body)
+    return SECBankDataExtractor.extract_financial_metrics(company_facts, start_date, end_date)
+
 
 def main():
     """
@@ -563,43 +896,56 @@ def main():
     
     # Download data
     df = extractor.download_bank_data(start_date, end_date)
+    extractor.close()
     
     if not df.empty:
-        print(f"\nData extraction completed!")
-        print(f"Total records: {len(df)}")
-        print(f"Companies with data: {df['CompanyName'].nunique()}")
-        print(f"Date range: {df['Datetime'].min()} to {df['Datetime'].max()}")
+        # The report is assembled in memory and written with a single stdout write
+        buf = io.StringIO()
+        print(f"\nData extraction completed!", file=buf)
+        print(f"Total records: {len(df)}", file=buf)
+        print(f"Companies with data: {df['CompanyName'].nunique()}", file=buf)
+        print(f"Date range: {df['Datetime'].min()} to {df['Datetime'].max()}", file=buf)
         
         # Save to Excel
         output_filename = f"bank_earnings_data_{start_date}_{end_date}.xlsx"
         extractor.save_to_excel(df, output_filename)
         
-        print(f"\nData saved to: {output_filename}")
+        # Columnar copy for analysis; much faster to write and read back than the workbook
+        parquet_filename = f"bank_earnings_data_{start_date}_{end_date}.parquet"
+        extractor.save_to_parquet(df, parquet_filename)
+        
+        print(f"\nData saved to: {output_filename} and {parquet_filename}", file=buf)
+        
+        # Non-null count per metric, from one scan over the metric block; reused by every report below
+        n = len(df)
+        present = ~pd.isna(df[extractor.target_metrics].to_numpy())
+        avail = pd.Series(np.count_nonzero(present, axis=0), index=extractor.target_metrics)
+        avail_pct = avail / n * 100
         
         # Display data quality metrics
-        total_possible_values = len(df) * len(extractor.target_metrics)
-        actual_values = df[extractor.target_metrics].notna().sum().sum()
+        total_possible_values = n * len(extractor.target_metrics)
+        actual_values = np.count_nonzero(present)
         data_completeness = (actual_values / total_possible_values) * 100
         
-        print(f"\nData Quality Summary:")
-        print(f"Data completeness: {data_completeness:.1f}%")
-        print(f"Total possible data points: {total_possible_values:,}")
-        print(f"Actual data points extracted: {actual_values:,}")
+        print(f"\nData Quality Summary:", file=buf)
+        print(f"Data completeness: {data_completeness:.1f}%", file=buf)
+        print(f"Total possible data points: {total_possible_values:,}", file=buf)
+        print(f"Actual data points extracted: {actual_values:,}", file=buf)
         
         # Show top metrics by data availability
-        print(f"\nTop 10 metrics by data availability:")
-        metric_availability = df[extractor.target_metrics].notna().sum().sort_values(ascending=False)
+        print(f"\nTop 10 metrics by data availability:", file=buf)
+        metric_availability = avail.sort_values(ascending=False)
         for i, (metric, count) in enumerate(metric_availability.head(10).items()):
-            percentage = (count / len(df)) * 100
-            print(f"{i+1:2d}. {metric:<25} {count:4d} records ({percentage:5.1f}%)")
+            percentage = avail_pct[metric]
+            print(f"{i+1:2d}. {metric:<25} {count:4d} records ({percentage:5.1f}%)", file=buf)
         
         # Display sample data for most important metrics
         important_columns = ['Datetime', 'CompanyName'] + extractor.target_metrics[:10]
-        print(f"\nSample data preview (Top 10 priority metrics):")
-        print(df[important_columns].head(3).to_string(index=False))
+        print(f"\nSample data preview (Top 10 priority metrics):", file=buf)
+        print(df[important_columns].head(3).to_string(index=False), file=buf)
         
         # Show metrics by tier
-        print(f"\nMetrics organized by priority tiers:")
+        print(f"\nMetrics organized by priority tiers:", file=buf)
         tier_ranges = [
             (1, 7, "TIER 1: Core Profitability & Performance"),
             (8, 15, "TIER 2: Capital & Balance Sheet Strength"),
@@ -613,12 +959,18 @@ def main():
         ]
         
         for start_idx, end_idx, tier_name in tier_ranges:
-            print(f"\n{tier_name}:")
+            print(f"\n{tier_name}:", file=buf)
             tier_metrics = extractor.target_metrics[start_idx-1:end_idx]
-            for i, metric in enumerate(tier_metrics, start_idx):
-                availability = df[metric].notna().sum()
-                percentage = (availability / len(df)) * 100 if len(df) > 0 else 0
-                print(f"  {i:2d}. {metric:<30} ({availability:3d} records, {percentage:5.1f}%)")
+            # One small frame per tier, padded and formatted in a single to_string call
+            tier_df = pd.DataFrame({
+                '#': range(start_idx, start_idx + len(tier_metrics)),
+                'metric': tier_metrics,
+                'records': avail[tier_metrics].to_numpy(),
+                'pct': avail_pct[tier_metrics].to_numpy()
+            })
+            print(tier_df.to_string(index=False, formatters={'metric': '{:<30}'.format, 'pct': '{:5.1f}%'.format}), file=buf)
+        
+        sys.stdout.write(buf.getvalue())
         
     else:
         print("No data was extracted. Please check the logs for errors.")
@@ -1,8 +1,23 @@
 from secedgar.core.rest import get_company_facts
-from datetime import datetime, timedelta
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import os
+import orjson
+import threading
+import time
 import pandas as pd
+from gaap_tags import TAG_TARGETS
+try:
+    import polars as pl  # multi-threaded pivot over Arrow buffers
+except ImportError:
+    pl = None
 
 # ─── 1. CONFIGURE ────────────────────────────────────────────────────────────
+parser = argparse.ArgumentParser(description="Download 10 years of XBRL facts for the top 20 US banks")
+parser.add_argument("--xlsx", action="store_true", help="also write an Excel copy next to the Parquet file")
+args = parser.parse_args()
+
 USER_AGENT = "Your Name (your.email@example.com)"
 
 TOP20 = [
@@ -10,63 +25,157 @@ TOP20 = [
     "BK",  "SCHW", "TCB", "AXP", "STT", "CFG", "FITB", "KEY", "RF", "NTRS", "HBAN"
 ]
 
-# threshold for “last decade”
+# threshold for “last decade”; ISO date strings compare chronologically as plain strings
 cutoff_date = datetime.now() - timedelta(days=365 * 10)
+cutoff_str = cutoff_date.strftime("%Y-%m-%d")
+
+_VALID_FORMS = frozenset({"10-K", "10-Q"})
+_USD = "USD"
+
+# only the XBRL tags behind the extractor's tiered target metrics are flattened
+TARGET_TAGS = frozenset(TAG_TARGETS)
+
+# SEC fair-access policy: at most 10 requests per second per client
+SEC_MAX_REQUESTS_PER_SECOND = 10
+FETCH_WORKERS = 8
 
+# one cached response per ticker per day, so reruns on the same day skip the network
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sec_edgar")
+
+
+class _RateLimiter:
+    """Spaces request start times at least 1/rate seconds apart across all threads"""
+    
+    def __init__(self, rate):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+_limiter = _RateLimiter(SEC_MAX_REQUESTS_PER_SECOND)
+
+
+def fetch_facts(ticker):
+    """Company-facts response for one ticker (None if not found), from today's disk cache or within the SEC rate limit"""
+    cache_path = os.path.join(CACHE_DIR, f"{ticker}-{date.today().isoformat()}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            return orjson.loads(f.read())
+    
+    _limiter.wait()
+    resp = get_company_facts(lookups=ticker, user_agent=USER_AGENT).get(ticker)
+    if resp is not None:
+        # write-then-rename, so an interrupted run never leaves a truncated cache file
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(resp))
+        os.replace(tmp_path, cache_path)
+    return resp
+
+
+def to_wide(long_df):
+    """Pivot one ticker's long (Company, Datetime, Metric, Value) rows to one row per period end"""
+    # keep the first value per cell up front, so pivot is a plain reshape with no groupby aggregation
+    long_df = long_df.drop_duplicates(["Company", "Datetime", "Metric"], keep="first")
+    
+    if pl is not None:
+        # reshape in Polars, back to pandas only for the concat and writers
+        return (
+            pl.from_pandas(long_df)
+            .pivot(on="Metric", index=["Company", "Datetime"], values="Value", aggregate_function="first")
+            .to_pandas()
+        )
+    
+    wide = long_df.pivot(
+        index=["Company", "Datetime"],
+        columns="Metric",
+        values="Value"
+    )
+    # categorical Metric leaves a CategoricalIndex header; make it a plain Index
+    # before the key columns are inserted back, and remove axis name
+    wide.columns = wide.columns.astype(str)
+    wide.columns.name = None
+    return wide.reset_index()
 
 # ─── 2. FETCH & FLATTEN ALL FACTS ────────────────────────────────────────────
-records = []
+# network-bound: fetch every ticker's facts concurrently, then flatten once all are in memory
+with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+    responses = dict(zip(TOP20, executor.map(fetch_facts, TOP20)))
+
+frames = []
 for ticker in TOP20:
-    # fetch every fact for this ticker
-    facts_dict = get_company_facts(lookups=ticker, user_agent=USER_AGENT)
-    resp = facts_dict.get(ticker)
+    resp = responses[ticker]
     if resp is None:
         continue
     usgaap = resp.get("facts", {}).get("us-gaap", {})
     
-    for tag, info in usgaap.items():
-        for unit, entries in info.get("units", {}).items():
-            if unit != "USD":
-                continue
-            
-            for entry in entries:
-                form = entry.get("form")
-                if form not in ("10-K", "10-Q"):
-                    continue
-                
-                period_end = datetime.fromisoformat(entry.get("end"))
-                if period_end < cutoff_date:
-                    continue
-
-                records.append({
-                    "Company": ticker,
-                    "Datetime": period_end,
-                    "Metric": tag,
-                    "Value": entry.get("val")
-                })
+    # column arrays for every USD entry of this ticker, pulled out tag by tag
+    ends, vals, metrics = [], [], []
+    for tag in TARGET_TAGS & usgaap.keys():
+        entries = usgaap[tag].get("units", {}).get(_USD)
+        if not entries:
+            continue
+        # form and cutoff checks on the raw strings, so rejected entries are never parsed.
+        # One filtered pass in listing order: the SEC does not guarantee unit lists are sorted by
+        # period end, so an early break at the cutoff could drop in-range entries
+        kept = [
+            entry for entry in entries
+            if entry.get("end", "") >= cutoff_str and entry.get("form") in _VALID_FORMS
+        ]
+        ends += [entry["end"] for entry in kept]
+        vals += [entry.get("val") for entry in kept]
+        metrics += [tag] * len(kept)
+    
+    # one vectorized date parse per ticker instead of per entry; cache parses each distinct period end once.
+    # Arrow-backed dtypes (Metric stays categorical) keep the pivot on Arrow buffers and hand off
+    # to Polars / Parquet without conversion
+    ticker_df = pd.DataFrame({
+        "Company": ticker,
+        "Datetime": pd.to_datetime(ends, format="%Y-%m-%d", cache=True),
+        "Metric": pd.Categorical(metrics),
+        "Value": vals
+    }).convert_dtypes(dtype_backend="pyarrow")
+    
+    # wide per ticker, so the long rows of only one company are alive at a time
+    if not ticker_df.empty:
+        frames.append(to_wide(ticker_df))
 
 
 # ─── 3. BUILD WIDE DATAFRAME ─────────────────────────────────────────────────
-# build dataframe and pivot to wide format
-df = pd.DataFrame.from_records(records)
-
-df_wide = (
-    df
-    .pivot_table(
-        index=["Company", "Datetime"],
-        columns="Metric",
-        values="Value",
-        aggfunc="first"
-    )
-    .reset_index()
-)
-# remove axis name and sort
-df_wide.columns.name = None
-df_wide = df_wide.sort_values(["Company", "Datetime"])
-
-# ─── 4. SAVE TO EXCEL ────────────────────────────────────────────────────────
-output_path = "top20_banks_last10yrs.xlsx"
-with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-    df_wide.to_excel(writer, index=False, sheet_name="Earnings")  
+# stack the per-ticker wide frames; metric columns are the union across tickers, sorted by name
+df_wide = pd.concat(frames, ignore_index=True)
+# 20 distinct tickers: category codes make the sort below compare ints, not strings
+df_wide["Company"] = df_wide["Company"].astype("category")
+metric_cols = sorted(col for col in df_wide.columns if col not in ("Company", "Datetime"))
+# the Polars and pandas pivots hand back different dtypes (float64 / int64[pyarrow], numpy / Arrow
+# timestamps); pin one schema so the Parquet file does not depend on whether Polars is installed
+df_wide["Datetime"] = df_wide["Datetime"].astype("datetime64[ns]")
+df_wide[metric_cols] = df_wide[metric_cols].astype("float64")
+# sort just the two key columns, then reorder rows and columns in a single gather
+# instead of a full-frame copy for the column selection and another for the sort
+row_order = df_wide[["Company", "Datetime"]].sort_values(["Company", "Datetime"]).index
+col_order = df_wide.columns.get_indexer(["Company", "Datetime", *metric_cols])
+df_wide = df_wide.iloc[row_order, col_order]
 
+# ─── 4. SAVE ─────────────────────────────────────────────────────────────────
+# Parquet by default: columnar, one pass; Company is dictionary-encoded
+output_path = "top20_banks_last10yrs.parquet"
+df_wide.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False,
+                   use_dictionary=["Company"])
 print(f"✔️ Saved earnings metrics to {output_path}")
+
+if args.xlsx:
+    xlsx_path = "top20_banks_last10yrs.xlsx"
+    # default xlsxwriter mode: to_excel writes column by column, which constant_memory would truncate
+    with pd.ExcelWriter(xlsx_path, engine="xlsxwriter") as writer:
+        df_wide.to_excel(writer, index=False, sheet_name="Earnings")
+    print(f"✔️ Saved earnings metrics to {xlsx_path}")